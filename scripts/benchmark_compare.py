@@ -5,25 +5,38 @@ SQLite vs PostgreSQL Direct Comparison Benchmark
 Fair comparison using native drivers (no CLI overhead):
 - sqlite3 module (in-process)
 - psycopg2 (connection pooling)
+- psycopg 3, if installed (asyncio + pipeline mode variant)
 
-Usage: python3 scripts/benchmark_compare.py
+Usage: python3 scripts/benchmark_compare.py [--cold-cache | --warm-only] [--trgm]
+
+Serial benchmarks report both cold and warm numbers by default. With
+psycopg 3 installed they also report pipelined throughput alongside the
+per-query latency.
 """
 
 import os
 import sys
 import time
+import asyncio
+import argparse
 import sqlite3
 import threading
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait
 
 try:
     import psycopg2
     from psycopg2 import pool
+    from psycopg2.extras import execute_batch
 except ImportError:
     print("ERROR: psycopg2 not installed. Run: pip install psycopg2-binary")
     sys.exit(1)
 
+try:
+    import psycopg  # Optional psycopg 3: asyncio + pipeline mode variants
+except ImportError:
+    psycopg = None
+
 # Colors
 GREEN = "\033[32m"
 RED = "\033[31m"
@@ -46,17 +59,77 @@ def find_plex_db():
     return None
 
 # PostgreSQL config
-PG_CONFIG = {
-    "host": os.environ.get("PLEX_PG_HOST", "localhost"),
-    "port": int(os.environ.get("PLEX_PG_PORT", 5432)),
-    "database": os.environ.get("PLEX_PG_DATABASE", "plex"),
-    "user": os.environ.get("PLEX_PG_USER", "plex"),
-    "password": os.environ.get("PLEX_PG_PASSWORD", "plex"),
-}
+# TCP/IP: set PLEX_PG_HOST to hostname (e.g., localhost or 127.0.0.1)
+# Unix socket: set PLEX_PG_SOCKET to socket directory (e.g., /var/run/postgresql or /tmp)
+PG_HOST = os.environ.get("PLEX_PG_HOST", "localhost")
+PG_PORT = int(os.environ.get("PLEX_PG_PORT", 5432))
+PG_SOCKET = os.environ.get("PLEX_PG_SOCKET", "/var/run/postgresql")
+PG_DATABASE = os.environ.get("PLEX_PG_DATABASE", "plex")
+PG_USER = os.environ.get("PLEX_PG_USER", "plex")
+PG_PASSWORD = os.environ.get("PLEX_PG_PASSWORD", "plex")
 PG_SCHEMA = os.environ.get("PLEX_PG_SCHEMA", "plex")
 
-def run_benchmark(name, sqlite_func, pg_func, iterations=100):
-    """Run a benchmark comparing SQLite vs PostgreSQL"""
+def get_pg_config(use_socket: bool = False) -> dict:
+    """Get PostgreSQL connection config for TCP or Unix socket."""
+    if use_socket:
+        return {"host": PG_SOCKET, "port": PG_PORT, "database": PG_DATABASE, "user": PG_USER,
+                "password": PG_PASSWORD, "sslmode": "disable"}
+    return {"host": PG_HOST, "port": PG_PORT, "database": PG_DATABASE, "user": PG_USER, "password": PG_PASSWORD}
+
+def check_socket_available() -> bool:
+    """Check if Unix socket is available."""
+    return (Path(PG_SOCKET) / f".s.PGSQL.{PG_PORT}").exists()
+
+# Prefer the Unix socket when available (set in main), loopback TCP otherwise
+PG_CONFIG = get_pg_config()
+
+def open_sqlite(db_path, **kwargs):
+    """Open a read-only SQLite connection; all readers share one page cache."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro&cache=shared", uri=True,
+                           check_same_thread=False, isolation_level=None, **kwargs)
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256MB mapped, no read(2) in the hot path
+    conn.execute("PRAGMA cache_size=-65536")    # 64MB page cache
+    return conn
+
+# Shared worker pool, created once in main() so thread start-up stays out
+# of every measured window
+EXECUTOR = None
+
+def wait_all(futures):
+    """Wait for every worker, then re-raise the first exception any of them hit."""
+    wait(futures)
+    for future in futures:
+        future.result()
+
+# Rows per write transaction in the mixed workload
+WRITE_BATCH = 50
+
+def sqlite_connect(db_path, timeout=5.0, **kwargs):
+    """Open the SQLite DB read-write (URI) with the pragmas of a tuned WAL deployment."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=rw", uri=True, timeout=timeout, **kwargs)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+    return conn
+
+def set_journal_mode(db_path, journal) -> str:
+    """Switch the database journal mode (persistent), returns the previous mode."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=rw", uri=True, timeout=5)
+    previous = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    # SQLite answers with the mode actually in effect, which can differ (e.g. DB busy)
+    current = conn.execute(f"PRAGMA journal_mode={journal.upper()}").fetchone()[0]
+    conn.close()
+    if current.lower() != journal.lower():
+        print(f"{RED}ERROR: Could not switch journal mode to {journal.upper()} (still {current.upper()}){NC}")
+        sys.exit(1)
+    return previous
+
+def run_benchmark(name, sqlite_func, pg_func, iterations=100, pg_pipeline=None):
+    """Run a benchmark comparing SQLite vs PostgreSQL
+
+    pg_pipeline, if given, runs all iterations at once in psycopg 3 pipeline
+    mode; it is reported as throughput next to the per-query latency.
+    """
     print(f"{YELLOW}[{name}]{NC} ({iterations} iterations)")
 
     # SQLite
@@ -75,7 +148,13 @@ def run_benchmark(name, sqlite_func, pg_func, iterations=100):
 
     # Results
     print(f"  SQLite:     {sqlite_per:6.2f} ms/query")
-    print(f"  PostgreSQL: {pg_per:6.2f} ms/query")
+    print(f"  PostgreSQL: {pg_per:6.2f} ms/query (per-query latency)")
+
+    if pg_pipeline is not None:
+        start = time.perf_counter()
+        pg_pipeline(iterations)
+        pipeline_per = (time.perf_counter() - start) * 1000 / iterations
+        print(f"  PG pipeline:{pipeline_per:6.2f} ms/query (pipelined throughput, psycopg 3)")
 
     if sqlite_per < pg_per:
         speedup = pg_per / sqlite_per
@@ -87,45 +166,223 @@ def run_benchmark(name, sqlite_func, pg_func, iterations=100):
 
     return sqlite_per, pg_per
 
-def run_concurrent_benchmark(name, sqlite_func, pg_func, clients=10, queries_per=50):
-    """Run concurrent benchmark"""
+# Serial benchmarks: (name, SQL, PostgreSQL statement name, params, iterations).
+# The SQL is written once; {schema} is empty for SQLite and "<schema>." for
+# PostgreSQL, where it is PREPAREd with the ? placeholder rewritten to $1.
+SERIAL_BENCHMARKS = [
+    ("Simple SELECT by ID", "SELECT id, title, rating FROM {schema}metadata_items WHERE id = ?",
+     "sel_id", (1000,), 1000),
+    ("SELECT with LIKE pattern", "SELECT id, title FROM {schema}metadata_items WHERE title LIKE ? LIMIT 100",
+     "sel_like", ("%The%",), 500),
+    ("COUNT aggregate", "SELECT COUNT(*) FROM {schema}metadata_items WHERE metadata_type = ?",
+     "sel_count", (1,), 500),
+    ("JOIN query", """
+        SELECT m.title, mi.duration
+        FROM {schema}metadata_items m
+        JOIN {schema}media_items mi ON mi.metadata_item_id = m.id
+        WHERE m.metadata_type = ? LIMIT 100
+    """, "sel_join", (1,), 200),
+    ("ORDER BY + LIMIT", """
+        SELECT id, title, added_at FROM {schema}metadata_items
+        WHERE metadata_type = ?
+        ORDER BY added_at DESC LIMIT 50
+    """, "sel_order", (1,), 500),
+]
+
+def reset_caches(sqlite_conn, pg_cur):
+    """Start the timed window cold: empty SQLite's page cache, reset the PG session.
+
+    The server's shared_buffers and the OS page cache cannot be dropped from a
+    client, so "cold" here means cold connection-level caches (page cache,
+    catalog/plan caches), not a cold disk.
+    """
+    sqlite_conn.execute("PRAGMA shrink_memory")
+    sqlite_conn.execute("PRAGMA cache_size=0")
+    sqlite_conn.execute("PRAGMA cache_size=-65536")
+    pg_cur.execute("DISCARD ALL")
+
+TRGM_INDEX = "idx_mi_title_trgm"
+
+def create_trgm_index():
+    """Create pg_trgm + a GIN trigram index on titles, as a production install would.
+
+    Returns (available, created): created is True only when this call built
+    the index, so the caller knows whether to drop it again. Needs CREATE
+    privileges; returns (False, False) (and the LIKE benchmark runs without
+    the index) when that is not permitted.
+    """
+    conn = psycopg2.connect(**PG_CONFIG)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (f"{PG_SCHEMA}.{TRGM_INDEX}",))
+            if cur.fetchone()[0] is not None:
+                return True, False
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cur.execute(f"CREATE INDEX {TRGM_INDEX} ON {PG_SCHEMA}.metadata_items "
+                        "USING gin (title gin_trgm_ops)")
+            cur.execute(f"ANALYZE {PG_SCHEMA}.metadata_items")
+        return True, True
+    except psycopg2.Error as e:
+        print(f"{YELLOW}WARNING: trigram index not created: {e}{NC}")
+        return False, False
+    finally:
+        conn.close()
+
+def drop_trgm_index():
+    """Drop the trigram index again, leaving the Plex schema as we found it."""
+    conn = psycopg2.connect(**PG_CONFIG)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP INDEX IF EXISTS {PG_SCHEMA}.{TRGM_INDEX}")
+    finally:
+        conn.close()
+
+# GIN indexes are only used through bitmap scans; turning those off hides the
+# trigram index without dropping it
+NO_TRGM_SETTINGS = ("SET enable_bitmapscan = off",)
+
+def run_serial_benchmark(name, sql, stmt, params, iterations, cache="warm", pg_settings=()):
+    """Run one serial benchmark on fresh connections, starting cold or warm.
+
+    Fresh connections per benchmark keep one benchmark's cache state (and
+    transaction snapshot) from leaking into the next. pg_settings are SET
+    statements applied to the PostgreSQL sessions before PREPARE.
+    """
+    sqlite_sql = sql.format(schema="")
+    # One long-lived cursor: Connection.execute() would allocate a new Cursor
+    # per query. The larger statement cache keeps every query compiled.
+    sqlite_conn = open_sqlite(PLEX_DB, cached_statements=512)
+    sqlite_cur = sqlite_conn.cursor()
+
+    # Autocommit: no BEGIN round-trip, and DISCARD ALL may not run in a transaction
+    pg_conn = psycopg2.connect(**PG_CONFIG)
+    pg_conn.autocommit = True
+    pg_cur = pg_conn.cursor()
+
+    if cache == "cold":
+        reset_caches(sqlite_conn, pg_cur)
+    for setting in pg_settings:
+        pg_cur.execute(setting)
+
+    # Server-side prepared statement: parse + plan once, like SQLite's statement cache
+    pg_cur.execute(f"PREPARE {stmt} AS {sql.format(schema=f'{PG_SCHEMA}.').replace('?', '$1')}")
+    pg_execute = f"EXECUTE {stmt}(%s)"
+
+    def sqlite_func():
+        sqlite_cur.execute(sqlite_sql, params).fetchall()
+
+    def pg_func():
+        pg_cur.execute(pg_execute, params)
+        pg_cur.fetchall()
+
+    # psycopg 3 pipeline mode: send every query before awaiting any result
+    pg_pipeline = None
+    if psycopg is not None:
+        pg3_conn = psycopg.connect(**get_pg3_config(), autocommit=True)
+        pg3_cur = pg3_conn.cursor()
+        for setting in pg_settings:
+            pg3_cur.execute(setting)
+        pg3_sql = sql.format(schema=f"{PG_SCHEMA}.").replace("?", "%s")
+
+        def pg_pipeline(iterations):
+            with pg3_conn.pipeline():
+                pg3_cur.executemany(pg3_sql, [params] * iterations, returning=True)
+            while True:
+                pg3_cur.fetchall()
+                if not pg3_cur.nextset():
+                    break
+
+    if cache == "warm":
+        # One untimed pass so the measured window starts from warm caches
+        sqlite_func()
+        pg_func()
+        if pg_pipeline is not None:
+            pg_pipeline(1)
+
+    try:
+        return run_benchmark(f"{name}, {cache}", sqlite_func, pg_func, iterations, pg_pipeline)
+    finally:
+        if pg_pipeline is not None:
+            pg3_cur.close()
+            pg3_conn.close()
+        pg_cur.close()
+        pg_conn.close()
+        sqlite_cur.close()
+        sqlite_conn.close()
+
+def get_pg3_config() -> dict:
+    """PG_CONFIG with psycopg 3 keyword names (it has no 'database' alias)."""
+    return {("dbname" if key == "database" else key): value for key, value in PG_CONFIG.items()}
+
+def run_async_pg_benchmark(sql, params, clients, queries_per):
+    """Run the concurrent reads as asyncio coroutines over psycopg 3 (total ms)."""
+    async def worker(conn):
+        # One persistent connection per coroutine; executemany pipelines all
+        # queries_per statements and reads the results back in one flush
+        async with conn.cursor() as cur:
+            await cur.executemany(sql, [params] * queries_per, returning=True)
+            while True:
+                await cur.fetchone()
+                if not cur.nextset():
+                    break
+
+    async def run_all():
+        # Connect every client up front: only the queries are timed
+        config = get_pg3_config()
+        conns = await asyncio.gather(*[psycopg.AsyncConnection.connect(**config) for _ in range(clients)])
+        try:
+            start = time.perf_counter()
+            await asyncio.gather(*[worker(conn) for conn in conns])
+            return (time.perf_counter() - start) * 1000
+        finally:
+            for conn in conns:
+                await conn.close()
+
+    return asyncio.run(run_all())
+
+def run_concurrent_benchmark(name, sqlite_func, pg_func, clients=10, queries_per=50, pg_sql=None, pg_params=()):
+    """Run concurrent benchmark (sqlite_func and pg_func each get a cursor)
+
+    With psycopg 3 installed and pg_sql given, the PostgreSQL side is also run
+    as asyncio coroutines in pipeline mode and reported on its own line.
+    """
     print(f"{YELLOW}[{name}]{NC} ({clients} clients, {queries_per} queries each)")
 
     total_queries = clients * queries_per
 
     # SQLite concurrent
     def sqlite_worker():
-        conn = sqlite3.connect(PLEX_DB, check_same_thread=False)
+        conn = open_sqlite(PLEX_DB, cached_statements=512)
+        cur = conn.cursor()
         for _ in range(queries_per):
-            sqlite_func(conn)
+            sqlite_func(cur)
+        cur.close()
         conn.close()
 
     start = time.perf_counter()
-    threads = [threading.Thread(target=sqlite_worker) for _ in range(clients)]
-    for t in threads:
-        t.start()
-    for t in threads:
-        t.join()
+    wait_all([EXECUTOR.submit(sqlite_worker) for _ in range(clients)])
     sqlite_time = (time.perf_counter() - start) * 1000
     sqlite_qps = total_queries / (sqlite_time / 1000)
 
-    # PostgreSQL concurrent (with connection pool)
-    pg_pool = pool.ThreadedConnectionPool(1, clients + 5, **PG_CONFIG)
+    # PostgreSQL concurrent (one pooled connection per client, opened up front)
+    pg_pool = pool.ThreadedConnectionPool(clients, clients, **PG_CONFIG)
 
     def pg_worker():
+        # Bind connection + cursor to the worker for its lifetime, so the
+        # pool lock is never taken inside the measured query loop
         conn = pg_pool.getconn()
         try:
+            cur = conn.cursor()
             for _ in range(queries_per):
-                pg_func(conn)
+                pg_func(cur)
+            cur.close()
         finally:
             pg_pool.putconn(conn)
 
     start = time.perf_counter()
-    threads = [threading.Thread(target=pg_worker) for _ in range(clients)]
-    for t in threads:
-        t.start()
-    for t in threads:
-        t.join()
+    wait_all([EXECUTOR.submit(pg_worker) for _ in range(clients)])
     pg_time = (time.perf_counter() - start) * 1000
     pg_qps = total_queries / (pg_time / 1000)
 
@@ -135,6 +392,11 @@ def run_concurrent_benchmark(name, sqlite_func, pg_func, clients=10, queries_per
     print(f"  SQLite:     {sqlite_time:.0f}ms total ({sqlite_qps:.0f} queries/sec)")
     print(f"  PostgreSQL: {pg_time:.0f}ms total ({pg_qps:.0f} queries/sec)")
 
+    if pg_sql and psycopg is not None:
+        async_time = run_async_pg_benchmark(pg_sql, pg_params, clients, queries_per)
+        async_qps = total_queries / (async_time / 1000)
+        print(f"  PG asyncio: {async_time:.0f}ms total ({async_qps:.0f} queries/sec, psycopg 3 pipeline)")
+
     if sqlite_qps > pg_qps:
         speedup = sqlite_qps / pg_qps
         print(f"  Winner:     {RED}SQLite ({speedup:.1f}x more throughput){NC}")
@@ -148,63 +410,75 @@ def run_concurrent_benchmark(name, sqlite_func, pg_func, clients=10, queries_per
 def run_mixed_workload(name, duration=5):
     """Run mixed read/write workload - SQLite's weakness"""
     print(f"{YELLOW}[{name}]{NC} ({duration}s, 5 readers + 3 writers)")
-    print(f"  SQLite locks entire DB during writes, PostgreSQL doesn't...")
+    print(f"  SQLite (WAL) allows one writer at a time, PostgreSQL doesn't...")
     print()
 
-    sqlite_reads = [0]
-    sqlite_writes = [0]
-    pg_reads = [0]
-    pg_writes = [0]
-    stop_flag = [False]
+    # Per-worker totals, each appended once when its worker exits
+    sqlite_reads = []
+    sqlite_writes = []
+    pg_reads = []
+    pg_writes = []
+    stop_flag = threading.Event()
+
+    # Hot-path SQL, built once and bound with parameters
+    sqlite_read_sql = "SELECT COUNT(*) FROM metadata_items WHERE metadata_type = ?"
+    sqlite_write_sql = "INSERT INTO benchmark_writes (val) VALUES (?)"
+    pg_read_sql = f"SELECT COUNT(*) FROM {PG_SCHEMA}.metadata_items WHERE metadata_type = %s"
+    pg_write_sql = f"INSERT INTO {PG_SCHEMA}.benchmark_writes (val) VALUES (%s)"
 
     # SQLite reader
     def sqlite_reader():
-        conn = sqlite3.connect(PLEX_DB, timeout=30)
-        while not stop_flag[0]:
+        conn = open_sqlite(PLEX_DB, timeout=30)
+        cur = conn.cursor()
+        stopped = stop_flag.is_set
+        local_reads = 0
+        while not stopped():
             try:
-                conn.execute("SELECT COUNT(*) FROM metadata_items WHERE metadata_type = 1").fetchone()
-                sqlite_reads[0] += 1
+                cur.execute(sqlite_read_sql, (1,)).fetchone()
+                local_reads += 1
             except sqlite3.OperationalError:
                 pass  # Database locked
+        cur.close()
         conn.close()
+        sqlite_reads.append(local_reads)
 
     # SQLite writer
     def sqlite_writer():
-        conn = sqlite3.connect(PLEX_DB, timeout=30)
+        conn = sqlite_connect(PLEX_DB, timeout=30)
         conn.execute("CREATE TABLE IF NOT EXISTS benchmark_writes (id INTEGER PRIMARY KEY, val INTEGER)")
-        while not stop_flag[0]:
+        conn.commit()
+        rows = [(42,)] * WRITE_BATCH
+        stopped = stop_flag.is_set
+        local_writes = 0
+        while not stopped():
             try:
-                conn.execute("INSERT INTO benchmark_writes (val) VALUES (?)", (42,))
+                conn.executemany(sqlite_write_sql, rows)
                 conn.commit()
-                sqlite_writes[0] += 1
+                local_writes += len(rows)
             except sqlite3.OperationalError:
-                pass  # Database locked
+                conn.rollback()  # Database locked
         conn.close()
+        sqlite_writes.append(local_writes)
 
     # Run SQLite mixed workload
-    threads = []
-    for _ in range(5):
-        threads.append(threading.Thread(target=sqlite_reader))
-    for _ in range(3):
-        threads.append(threading.Thread(target=sqlite_writer))
-
-    for t in threads:
-        t.start()
+    futures = [EXECUTOR.submit(sqlite_reader) for _ in range(5)]
+    futures += [EXECUTOR.submit(sqlite_writer) for _ in range(3)]
     time.sleep(duration)
-    stop_flag[0] = True
-    for t in threads:
-        t.join()
+    stop_flag.set()
+    wait_all(futures)
 
     # Cleanup SQLite
-    conn = sqlite3.connect(PLEX_DB)
+    conn = sqlite_connect(PLEX_DB)
     conn.execute("DROP TABLE IF EXISTS benchmark_writes")
     conn.commit()
     conn.close()
 
-    print(f"  SQLite:     {sqlite_reads[0]} reads + {sqlite_writes[0]} writes")
+    sqlite_total_reads = sum(sqlite_reads)
+    sqlite_total_writes = sum(sqlite_writes)
+    print(f"  SQLite:     {sqlite_total_reads} reads + {sqlite_total_writes} writes")
 
     # Reset
-    stop_flag[0] = False
+    stop_flag.clear()
 
     # PostgreSQL pool
     pg_pool = pool.ThreadedConnectionPool(1, 20, **PG_CONFIG)
@@ -219,40 +493,40 @@ def run_mixed_workload(name, duration=5):
     # PostgreSQL reader
     def pg_reader():
         conn = pg_pool.getconn()
+        local_reads = 0
         try:
             cur = conn.cursor()
-            while not stop_flag[0]:
-                cur.execute(f"SELECT COUNT(*) FROM {PG_SCHEMA}.metadata_items WHERE metadata_type = 1")
+            stopped = stop_flag.is_set
+            while not stopped():
+                cur.execute(pg_read_sql, (1,))
                 cur.fetchone()
-                pg_reads[0] += 1
+                local_reads += 1
         finally:
             pg_pool.putconn(conn)
+            pg_reads.append(local_reads)
 
     # PostgreSQL writer
     def pg_writer():
         conn = pg_pool.getconn()
+        local_writes = 0
         try:
             cur = conn.cursor()
-            while not stop_flag[0]:
-                cur.execute(f"INSERT INTO {PG_SCHEMA}.benchmark_writes (val) VALUES (%s)", (42,))
+            rows = [(42,)] * WRITE_BATCH
+            stopped = stop_flag.is_set
+            while not stopped():
+                execute_batch(cur, pg_write_sql, rows, page_size=WRITE_BATCH)
                 conn.commit()
-                pg_writes[0] += 1
+                local_writes += len(rows)
         finally:
             pg_pool.putconn(conn)
+            pg_writes.append(local_writes)
 
     # Run PostgreSQL mixed workload
-    threads = []
-    for _ in range(5):
-        threads.append(threading.Thread(target=pg_reader))
-    for _ in range(3):
-        threads.append(threading.Thread(target=pg_writer))
-
-    for t in threads:
-        t.start()
+    futures = [EXECUTOR.submit(pg_reader) for _ in range(5)]
+    futures += [EXECUTOR.submit(pg_writer) for _ in range(3)]
     time.sleep(duration)
-    stop_flag[0] = True
-    for t in threads:
-        t.join()
+    stop_flag.set()
+    wait_all(futures)
 
     # Cleanup PostgreSQL
     conn = pg_pool.getconn()
@@ -262,10 +536,12 @@ def run_mixed_workload(name, duration=5):
     pg_pool.putconn(conn)
     pg_pool.closeall()
 
-    print(f"  PostgreSQL: {pg_reads[0]} reads + {pg_writes[0]} writes")
+    pg_total_reads = sum(pg_reads)
+    pg_total_writes = sum(pg_writes)
+    print(f"  PostgreSQL: {pg_total_reads} reads + {pg_total_writes} writes")
 
-    sqlite_total = sqlite_reads[0] + sqlite_writes[0]
-    pg_total = pg_reads[0] + pg_writes[0]
+    sqlite_total = sqlite_total_reads + sqlite_total_writes
+    pg_total = pg_total_reads + pg_total_writes
 
     if pg_total > sqlite_total:
         speedup = pg_total / sqlite_total if sqlite_total > 0 else float('inf')
@@ -276,7 +552,23 @@ def run_mixed_workload(name, duration=5):
     print()
 
 def main():
-    global PLEX_DB, sqlite_conn, pg_conn
+    global PLEX_DB, PG_CONFIG, EXECUTOR
+
+    parser = argparse.ArgumentParser(description="SQLite vs PostgreSQL direct comparison benchmark")
+    parser.add_argument("--trgm", action="store_true",
+                        help="also benchmark LIKE with a pg_trgm index (created if missing, dropped afterwards)")
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--cold-cache", action="store_true",
+                             help="serial benchmarks: only report cold-cache runs")
+    cache_group.add_argument("--warm-only", action="store_true",
+                             help="serial benchmarks: only report warm runs (one untimed pass first)")
+    args = parser.parse_args()
+    if args.cold_cache:
+        cache_modes = ("cold",)
+    elif args.warm_only:
+        cache_modes = ("warm",)
+    else:
+        cache_modes = ("cold", "warm")
 
     print(f"\n{BLUE}{'═' * 64}{NC}")
     print(f"{BLUE}{BOLD}     SQLite vs PostgreSQL Direct Comparison Benchmark{NC}")
@@ -288,20 +580,26 @@ def main():
         print(f"{RED}ERROR: Cannot find Plex SQLite database{NC}")
         sys.exit(1)
 
+    use_socket = check_socket_available()
+    PG_CONFIG = get_pg_config(use_socket=use_socket)
+    conn_type = "Unix socket" if use_socket else "TCP/IP"
+
     print(f"SQLite:     {CYAN}{PLEX_DB}{NC}")
-    print(f"PostgreSQL: {CYAN}{PG_CONFIG['host']}:{PG_CONFIG['port']}/{PG_CONFIG['database']}{NC}")
+    print(f"PostgreSQL: {CYAN}{PG_CONFIG['host']}:{PG_PORT}/{PG_DATABASE}{NC} ({conn_type})")
     print()
 
-    # Connect
-    sqlite_conn = sqlite3.connect(PLEX_DB)
+    # Row counts (short-lived connections: every benchmark opens its own)
+    sqlite_conn = open_sqlite(PLEX_DB)
     sqlite_count = sqlite_conn.execute("SELECT COUNT(*) FROM metadata_items").fetchone()[0]
+    sqlite_conn.close()
     print(f"SQLite items:     {GREEN}{sqlite_count}{NC}")
 
     try:
         pg_conn = psycopg2.connect(**PG_CONFIG)
-        pg_cur = pg_conn.cursor()
-        pg_cur.execute(f"SELECT COUNT(*) FROM {PG_SCHEMA}.metadata_items")
-        pg_count = pg_cur.fetchone()[0]
+        with pg_conn.cursor() as pg_cur:
+            pg_cur.execute(f"SELECT COUNT(*) FROM {PG_SCHEMA}.metadata_items")
+            pg_count = pg_cur.fetchone()[0]
+        pg_conn.close()
         print(f"PostgreSQL items: {GREEN}{pg_count}{NC}")
     except Exception as e:
         print(f"{RED}ERROR: Cannot connect to PostgreSQL: {e}{NC}")
@@ -309,94 +607,51 @@ def main():
 
     print(f"\n{BLUE}{'═' * 64}{NC}\n")
 
-    # Benchmark 1: Simple SELECT by ID
-    def sqlite_select_id():
-        sqlite_conn.execute("SELECT id, title, rating FROM metadata_items WHERE id = 1000").fetchone()
-
-    def pg_select_id():
-        pg_cur.execute(f"SELECT id, title, rating FROM {PG_SCHEMA}.metadata_items WHERE id = 1000")
-        pg_cur.fetchone()
-
-    run_benchmark("Simple SELECT by ID", sqlite_select_id, pg_select_id, 1000)
-
-    # Benchmark 2: SELECT with LIKE
-    def sqlite_like():
-        sqlite_conn.execute("SELECT id, title FROM metadata_items WHERE title LIKE '%The%' LIMIT 100").fetchall()
-
-    def pg_like():
-        pg_cur.execute(f"SELECT id, title FROM {PG_SCHEMA}.metadata_items WHERE title LIKE '%The%' LIMIT 100")
-        pg_cur.fetchall()
-
-    run_benchmark("SELECT with LIKE pattern", sqlite_like, pg_like, 500)
-
-    # Benchmark 3: COUNT aggregate
-    def sqlite_count():
-        sqlite_conn.execute("SELECT COUNT(*) FROM metadata_items WHERE metadata_type = 1").fetchone()
-
-    def pg_count():
-        pg_cur.execute(f"SELECT COUNT(*) FROM {PG_SCHEMA}.metadata_items WHERE metadata_type = 1")
-        pg_cur.fetchone()
-
-    run_benchmark("COUNT aggregate", sqlite_count, pg_count, 500)
-
-    # Benchmark 4: JOIN
-    def sqlite_join():
-        sqlite_conn.execute("""
-            SELECT m.title, mi.duration
-            FROM metadata_items m
-            JOIN media_items mi ON mi.metadata_item_id = m.id
-            WHERE m.metadata_type = 1 LIMIT 100
-        """).fetchall()
-
-    def pg_join():
-        pg_cur.execute(f"""
-            SELECT m.title, mi.duration
-            FROM {PG_SCHEMA}.metadata_items m
-            JOIN {PG_SCHEMA}.media_items mi ON mi.metadata_item_id = m.id
-            WHERE m.metadata_type = 1 LIMIT 100
-        """)
-        pg_cur.fetchall()
+    # A trigram index is what a real deployment would have for title search;
+    # it changes the Plex schema, so only on request and only for this run
+    trgm, trgm_created = create_trgm_index() if args.trgm else (False, False)
 
-    run_benchmark("JOIN query", sqlite_join, pg_join, 200)
-
-    # Benchmark 5: ORDER BY + LIMIT
-    def sqlite_order():
-        sqlite_conn.execute("""
-            SELECT id, title, added_at FROM metadata_items
-            WHERE metadata_type = 1
-            ORDER BY added_at DESC LIMIT 50
-        """).fetchall()
-
-    def pg_order():
-        pg_cur.execute(f"""
-            SELECT id, title, added_at FROM {PG_SCHEMA}.metadata_items
-            WHERE metadata_type = 1
-            ORDER BY added_at DESC LIMIT 50
-        """)
-        pg_cur.fetchall()
-
-    run_benchmark("ORDER BY + LIMIT", sqlite_order, pg_order, 500)
+    # Benchmarks 1-5: serial queries, fresh connections per benchmark
+    try:
+        for name, sql, stmt, params, iterations in SERIAL_BENCHMARKS:
+            variants = [(name, ())]
+            if stmt == "sel_like" and trgm:
+                # Report LIKE with and without the trigram index
+                variants = [(f"{name}, trgm", ()), (f"{name}, no trgm", NO_TRGM_SETTINGS)]
+            for label, pg_settings in variants:
+                for cache in cache_modes:
+                    run_serial_benchmark(label, sql, stmt, params, iterations, cache, pg_settings)
+    finally:
+        if trgm_created:
+            drop_trgm_index()
 
     print(f"{BLUE}{'═' * 64}{NC}\n")
     print(f"{BOLD}Concurrent Access Tests{NC} (where PostgreSQL shines)\n")
 
+    clients = 10
+    EXECUTOR = ThreadPoolExecutor(max_workers=clients + 2)
+
     # Benchmark 6: Concurrent reads
-    def sqlite_concurrent_read(conn):
-        conn.execute("SELECT id, title FROM metadata_items WHERE id = ?", (1000,)).fetchone()
+    def sqlite_concurrent_read(cur):
+        cur.execute("SELECT id, title FROM metadata_items WHERE id = ?", (1000,)).fetchone()
 
-    def pg_concurrent_read(conn):
-        cur = conn.cursor()
+    def pg_concurrent_read(cur):
         cur.execute(f"SELECT id, title FROM {PG_SCHEMA}.metadata_items WHERE id = %s", (1000,))
         cur.fetchone()
 
-    run_concurrent_benchmark("Concurrent Reads", sqlite_concurrent_read, pg_concurrent_read, clients=10, queries_per=100)
-
-    # Benchmark 7: Mixed read/write
-    run_mixed_workload("Mixed Read+Write Workload", duration=5)
+    try:
+        run_concurrent_benchmark("Concurrent Reads", sqlite_concurrent_read, pg_concurrent_read, clients=clients, queries_per=100,
+                                 pg_sql=f"SELECT id, title FROM {PG_SCHEMA}.metadata_items WHERE id = %s", pg_params=(1000,))
 
-    # Cleanup
-    sqlite_conn.close()
-    pg_conn.close()
+        # Benchmark 7: Mixed read/write, SQLite in WAL like a tuned deployment
+        original_journal = set_journal_mode(PLEX_DB, "wal")
+        try:
+            run_mixed_workload("Mixed Read+Write Workload", duration=5)
+        finally:
+            # Leave the Plex database in the journal mode we found it in
+            set_journal_mode(PLEX_DB, original_journal)
+    finally:
+        EXECUTOR.shutdown()
 
     print(f"{BLUE}{'═' * 64}{NC}\n")
     print(f"{CYAN}Summary:{NC}")
@@ -12,25 +12,58 @@ This is where SQLite's single-writer limitation causes:
 - UI freezing
 
 PostgreSQL handles this with MVCC - no blocking between readers/writers.
+
+SQLite runs tuned (WAL + synchronous=NORMAL) by default; --worst-case also
+runs it with the rollback journal and library default pragmas, and reports
+both. Both runs use the same short lock timeouts.
+SCAN_BATCH (default 5) sets the rows per scanner transaction on every backend.
+PROGRESS_EVERY (default 20) sets how many playback polls share one watch
+progress write, the read-heavy mix of a real playback session.
+
+With asyncpg installed, the PostgreSQL test is also run as asyncio
+coroutines on a single thread.
+
+Every worker runs at a fixed target rate (--scanner-hz, --kometa-hz,
+--playback-hz), the same for every backend, and the results report how
+close each backend came to it.
+
+Usage: python3 scripts/benchmark_plex_stress.py [--worst-case] [--processes]
+           [--isolation {read_committed,repeatable_read,serializable}]
+           [--scanner-hz N] [--kometa-hz N] [--playback-hz N]
 """
 
+import io
 import os
+import math
+import re
 import sys
 import time
+import asyncio
+import argparse
 import sqlite3
 import threading
 import random
+import queue
+import multiprocessing as mp
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
+from collections import deque
+from itertools import chain
+from dataclasses import dataclass, field, fields
 
 try:
     import psycopg2
     from psycopg2 import pool
+    from psycopg2.extras import execute_batch
 except ImportError:
     print("ERROR: pip install psycopg2-binary")
     sys.exit(1)
 
+try:
+    import asyncpg  # Optional: single-threaded asyncio variant of the PostgreSQL test
+except ImportError:
+    asyncpg = None
+
 # Colors
 GREEN = "\033[32m"
 RED = "\033[31m"
@@ -61,6 +94,11 @@ PG_USER = os.environ.get("PLEX_PG_USER", "plex")
 PG_PASSWORD = os.environ.get("PLEX_PG_PASSWORD", "plex")
 PG_SCHEMA = os.environ.get("PLEX_PG_SCHEMA", "plex")
 
+# PgBouncer: set PLEX_PG_PGBOUNCER=1 to also run the TCP test through a local
+# pooler (transaction mode) listening on PLEX_PG_PGBOUNCER_PORT
+PG_PGBOUNCER = os.environ.get("PLEX_PG_PGBOUNCER") == "1"
+PG_PGBOUNCER_PORT = int(os.environ.get("PLEX_PG_PGBOUNCER_PORT", 6432))
+
 def get_pg_config(use_socket: bool = False) -> dict:
     """Get PostgreSQL connection config for TCP or Unix socket."""
     if use_socket:
@@ -84,207 +122,478 @@ def check_socket_available() -> bool:
     socket_file = Path(PG_SOCKET) / f".s.PGSQL.{PG_PORT}"
     return socket_file.exists()
 
-@dataclass
-class StressResults:
-    scan_writes: int = 0
-    scan_errors: int = 0
-    playback_reads: int = 0
-    playback_read_errors: int = 0
-    playback_writes: int = 0  # watch progress updates
-    playback_write_errors: int = 0
-    total_time_ms: float = 0
+# Scanner batches: one executemany on SQLite, one COPY on PostgreSQL.
+# updated_at is left to the column default (the insert time) on both engines.
+SCAN_COLUMNS = ("guid", "title", "summary", "duration", "added_at")
+SQLITE_SCAN_INSERT = """
+    INSERT INTO stress_metadata (guid, title, summary, duration, added_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+# Both playback reads in one round-trip, tagged by source. The media row is
+# the first id >= a random one, so a gap left by a rolled-back scanner batch
+# still returns a row (the next one) without a second query.
+PLAYBACK_READ = """
+    SELECT 'meta' AS src, id, title, duration FROM (
+        SELECT id, title, duration FROM {schema}stress_metadata
+        WHERE id >= {p1} ORDER BY id LIMIT 1
+    ) AS m
+    UNION ALL
+    SELECT 'item', id, title, rating FROM {schema}metadata_items WHERE id = {p2}
+"""
+SQLITE_PLAYBACK_READ = PLAYBACK_READ.format(schema="", p1="?", p2="?")
+PG_SCAN_COPY = f"COPY {PG_SCHEMA}.stress_metadata ({', '.join(SCAN_COLUMNS)}) FROM STDIN"
 
+# Scanner row material, built once so the hot loop only picks from pools
+SUMMARY = "A movie about things happening" * 10
+GUIDS = [f"com.plexapp.agents.imdb://{random.randint(1_000_000, 9_999_999)}" for _ in range(10_000)]
+TITLES = [f"Movie {i}" for i in range(1, 100_001)]
+DURATIONS = range(3_600_000, 10_800_001)
+ITEM_IDS = range(1, 60_001)  # metadata_items ids touched by Kometa and playback
 
-def run_sqlite_stress(db_path: str, duration: int = 10, num_streams: int = 4) -> StressResults:
-    """
-    Simulate heavy library scan + concurrent playback on SQLite.
+def scan_rows(batch_size: int, rng: random.Random = random) -> list:
+    """Build one scanner batch of SCAN_COLUMNS tuples.
 
-    Real-Debrid/rclone scenario:
-    - Scanner: Rapidly inserting/updating metadata (like scanning mounted cloud storage)
-    - Streams: Reading media info + updating watch progress
-    - Kometa: Concurrent metadata updates
+    Each column is drawn for the whole batch in one rng.choices call
+    rather than one randrange call per field.
     """
-    print(f"\n{YELLOW}[SQLite Stress Test]{NC}")
-    print(f"  Simulating: 2 scanners + {num_streams} streams + Kometa writes")
-    print(f"  Duration: {duration}s")
-    print(f"  This simulates real rclone/Real-Debrid + Kometa workload...\n")
+    now = time.time()  # One clock read per batch
+    return [
+        (guid, title, SUMMARY, duration, now)
+        for guid, title, duration in zip(rng.choices(GUIDS, k=batch_size),
+                                         rng.choices(TITLES, k=batch_size),
+                                         rng.choices(DURATIONS, k=batch_size))
+    ]
 
-    results = StressResults()
-    stop_flag = threading.Event()
-    lock = threading.Lock()
+def copy_text(rows: list) -> io.StringIO:
+    """Render rows as COPY text format (tab-separated, backslash-escaped)."""
+    def field(value) -> str:
+        return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+    return io.StringIO("".join("\t".join(map(field, row)) + "\n" for row in rows))
 
-    # Create test tables
-    conn = sqlite3.connect(db_path, timeout=30)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS stress_metadata (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+PG_STRESS_TABLES = (
+    f"""
+        CREATE TABLE IF NOT EXISTS {PG_SCHEMA}.stress_metadata (
+            id SERIAL PRIMARY KEY,
             guid TEXT,
             title TEXT,
             summary TEXT,
             duration INTEGER,
-            added_at REAL,
-            updated_at REAL
+            added_at DOUBLE PRECISION,
+            updated_at DOUBLE PRECISION DEFAULT extract(epoch FROM now())
         )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS stress_progress (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+    """,
+    f"""
+        CREATE TABLE IF NOT EXISTS {PG_SCHEMA}.stress_progress (
+            id SERIAL PRIMARY KEY,
             metadata_id INTEGER,
             view_offset INTEGER,
-            updated_at REAL
+            updated_at DOUBLE PRECISION
         )
-    """)
+    """,
+)
+
+# Kometa updates per write transaction, the same on every backend
+# (one execute_batch page = one round-trip on PostgreSQL)
+KOMETA_BATCH = 20
+
+# Statements for the PostgreSQL hot loops. The psycopg2 workers PREPARE them
+# once per connection (see pg_statements); asyncpg prepares them itself.
+PG_PREPARED = {
+    "sel_max_id": f"SELECT max(id) FROM {PG_SCHEMA}.stress_metadata",
+    "sel_playback": PLAYBACK_READ.format(schema=f"{PG_SCHEMA}.", p1="$1", p2="$2"),
+    "upd_item": f"UPDATE {PG_SCHEMA}.metadata_items SET updated_at = $1 WHERE id = $2",
+    "ins_prog": f"INSERT INTO {PG_SCHEMA}.stress_progress (metadata_id, view_offset, updated_at) VALUES ($1, $2, $3)",
+}
+
+# --isolation choices -> PostgreSQL isolation levels
+ISOLATION_LEVELS = {
+    "read_committed": "READ COMMITTED",
+    "repeatable_read": "REPEATABLE READ",
+    "serializable": "SERIALIZABLE",
+}
+
+def pg_set_isolation(conn, isolation: str):
+    """Set the session's default isolation level (one of ISOLATION_LEVELS)."""
+    with conn.cursor() as cur:
+        cur.execute(f"SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL {ISOLATION_LEVELS[isolation]}")
     conn.commit()
-    conn.close()
 
-    def library_scanner(scanner_id: int):
-        """Simulate heavy library scan - lots of writes with EXCLUSIVE lock"""
-        conn = sqlite3.connect(db_path, timeout=0.1)  # VERY short timeout
-        batch_size = 50  # Bigger batches = longer lock hold time
+def pg_statements(conn, *names: str, prepare: bool = True):
+    """Get a cursor + SQL for the named PG_PREPARED statements on a worker's connection.
+
+    With prepare, each statement is PREPAREd once and its SQL is the matching
+    EXECUTE. Transaction-mode poolers (PgBouncer) can't keep session-level
+    prepared statements, so without it the plain statements are sent instead.
+    """
+    cur = conn.cursor()
+    sql = {}
+    for name in names:
+        statement = PG_PREPARED[name]
+        if prepare:
+            cur.execute(f"PREPARE {name} AS {statement}")
+            nparams = statement.count("$")
+            sql[name] = f"EXECUTE {name}({', '.join(['%s'] * nparams)})" if nparams else f"EXECUTE {name}"
+        else:
+            sql[name] = re.sub(r"\$\d+", "%s", statement)
+    conn.commit()
+    return cur, sql
+
+# Per-connection pragmas for the tuned SQLite run (journal_mode=WAL is
+# persistent, so it is set once on the setup connection instead). No
+# busy_timeout: the short per-worker connect timeouts apply to both runs
+SQLITE_TUNED_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+)
 
-        while not stop_flag.is_set():
+# Rows per scanner transaction, the same on every backend (like the loop rates,
+# so op totals compare engines, not settings); sweep 1/5/50 to trade SQLite
+# lock-hold time for throughput
+SCAN_BATCH = int(os.environ.get("SCAN_BATCH", 5))
+
+# Playback polls per watch progress write (a real session reads far more than it writes)
+PROGRESS_EVERY = int(os.environ.get("PROGRESS_EVERY", 20))
+
+# Latency events kept per worker; the oldest are dropped on long runs
+EVENT_LOG = 100_000
+
+# Operation types recorded in StressResults.events, in print order
+OP_LABELS = {"scan": "Scan batch", "kometa": "Kometa batch", "read": "Playback read", "write": "Progress write"}
+
+def sqlite_connect(db_path: str, timeout: float, worst_case: bool = False) -> sqlite3.Connection:
+    """Open a stress-test connection: tuned pragmas, or library defaults.
+
+    Autocommit (isolation_level=None): callers open their own short
+    BEGIN IMMEDIATE transactions around each write batch.
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+    if not worst_case:
+        for pragma in SQLITE_TUNED_PRAGMAS:
+            conn.execute(pragma)
+    return conn
+
+@dataclass
+class StressResults:
+    scan_writes: int = 0
+    scan_errors: int = 0
+    playback_reads: int = 0
+    playback_read_errors: int = 0
+    playback_writes: int = 0  # watch progress updates
+    playback_write_errors: int = 0
+    total_time_ms: float = 0
+    # (start_ns, op, latency_us) per successful operation. Workers only append
+    # here; nothing is printed until the run is over.
+    events: deque = field(default_factory=lambda: deque(maxlen=EVENT_LOG))
+    # Target ops/sec per op type across all workers (TargetRates.totals)
+    targets: dict = field(default_factory=dict)
+
+    def record(self, op: str, start_ns: int):
+        """Log the latency of an operation that started at start_ns."""
+        self.events.append((start_ns, op, (time.perf_counter_ns() - start_ns) // 1000))
+
+def merge_counts(worker_counts: list) -> StressResults:
+    """Sum the per-worker counters once every worker has exited."""
+    merged = StressResults()
+    for counts in worker_counts:
+        for f in fields(StressResults):
+            if f.name not in ("events", "targets"):
+                setattr(merged, f.name, getattr(merged, f.name) + getattr(counts, f.name))
+    merged.events = deque(chain.from_iterable(counts.events for counts in worker_counts))
+    return merged
+
+@dataclass
+class TargetRates:
+    """Loop iterations/sec per worker, the same for every backend."""
+    scanner_hz: float = 200
+    kometa_hz: float = 50
+    playback_hz: float = 20
+
+    def totals(self, num_streams: int) -> dict:
+        """Target ops/sec per op type across 2 scanners, Kometa and the streams."""
+        return {
+            "scan": 2 * self.scanner_hz,
+            "kometa": self.kometa_hz,
+            "read": num_streams * self.playback_hz,
+            "write": num_streams * self.playback_hz / PROGRESS_EVERY,
+        }
+
+def paced(stop_flag, hz: float):
+    """Yield once per 1/hz deadline until stop_flag is set.
+
+    Sleeps until the next deadline instead of a fixed time after each
+    iteration, so the loop body's own cost doesn't lower the rate; a worker
+    that falls behind runs its next iteration at once to catch up.
+    """
+    interval = 1 / hz
+    next_deadline = time.monotonic()
+    while not stop_flag.is_set():
+        yield
+        next_deadline += interval
+        sleep_for = next_deadline - time.monotonic()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+
+async def apaced(stop_flag: asyncio.Event, hz: float):
+    """paced() for asyncio workers."""
+    interval = 1 / hz
+    next_deadline = time.monotonic()
+    while not stop_flag.is_set():
+        yield
+        next_deadline += interval
+        sleep_for = next_deadline - time.monotonic()
+        if sleep_for > 0:
+            await asyncio.sleep(sleep_for)
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted sample list."""
+    rank = math.ceil(pct / 100 * len(sorted_samples))
+    return sorted_samples[min(max(rank, 1), len(sorted_samples)) - 1]
+
+
+# SQLite stress workers. Module-level so they can run as threads or, with
+# --processes, as separate processes; each waits on the ready barrier once its
+# connection is open (or failed), so spawn/import and connect time stay out of
+# the measured run, and puts its StressResults on result_queue when it exits,
+# even if it could not open the database (run_sqlite_stress waits for one
+# result per worker).
+
+def sqlite_library_scanner(db_path: str, worst_case: bool, rates: TargetRates, stop_flag, result_queue,
+                           ready, scanner_id: int):
+    """Simulate heavy library scan - lots of writes in short IMMEDIATE transactions"""
+    counts = StressResults()
+    conn = None
+    rng = random.Random(f"scanner-{scanner_id}")  # Per-worker, reproducible stream
+    batch_size = SCAN_BATCH  # Bigger batches = longer lock hold time
+
+    try:
+        try:
+            conn = sqlite_connect(db_path, timeout=0.1, worst_case=worst_case)  # VERY short timeout
+        finally:
+            ready.wait()  # Start together, even if this connect failed
+        for _ in paced(stop_flag, rates.scanner_hz):
             try:
-                # BEGIN EXCLUSIVE simulates how Plex scanner works
-                conn.execute("BEGIN EXCLUSIVE")
-                for _ in range(batch_size):
-                    guid = f"com.plexapp.agents.imdb://{random.randint(1000000, 9999999)}"
-                    conn.execute("""
-                        INSERT INTO stress_metadata (guid, title, summary, duration, added_at, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        guid,
-                        f"Movie {random.randint(1, 100000)}",
-                        "A movie about things happening" * 10,
-                        random.randint(3600000, 10800000),
-                        time.time(),
-                        time.time()
-                    ))
+                rows = scan_rows(batch_size, rng)
+                start = time.perf_counter_ns()
+                # IMMEDIATE takes the write lock up front; short batches release it quickly
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(SQLITE_SCAN_INSERT, rows)
                 conn.commit()
-                with lock:
-                    results.scan_writes += batch_size
+                counts.scan_writes += batch_size
+                counts.record("scan", start)
             except sqlite3.OperationalError:
-                with lock:
-                    results.scan_errors += 1
+                counts.scan_errors += 1
                 try:
                     conn.rollback()
                 except:
                     pass
+    finally:
+        if conn is not None:
+            conn.close()
+        result_queue.put(counts)  # Always report, even if the worker fails
 
-            time.sleep(0.001)  # Aggressive scanning
 
-        conn.close()
+def sqlite_kometa_updater(db_path: str, worst_case: bool, rates: TargetRates, stop_flag, result_queue,
+                          ready):
+    """Simulate Kometa/PMM updating metadata - competing writer"""
+    counts = StressResults()
+    conn = None
+    rng = random.Random("kometa")
 
-    def kometa_updater():
-        """Simulate Kometa/PMM updating metadata - competing writer"""
-        conn = sqlite3.connect(db_path, timeout=0.1)  # VERY short timeout
-
-        while not stop_flag.is_set():
+    try:
+        try:
+            conn = sqlite_connect(db_path, timeout=0.1, worst_case=worst_case)  # VERY short timeout
+        finally:
+            ready.wait()  # Start together, even if this connect failed
+        for _ in paced(stop_flag, rates.kometa_hz):
             try:
-                # Kometa does EXCLUSIVE updates for batch operations
-                conn.execute("BEGIN EXCLUSIVE")
+                start = time.perf_counter_ns()
+                # Kometa batches a few updates per short write transaction
+                conn.execute("BEGIN IMMEDIATE")
                 # Update multiple items like Kometa does
-                for _ in range(5):
+                now = time.time()  # One clock read per batch
+                for item_id in rng.choices(ITEM_IDS, k=KOMETA_BATCH):
                     conn.execute("""
                         UPDATE metadata_items SET updated_at = ?
                         WHERE id = ?
-                    """, (time.time(), random.randint(1, 60000)))
+                    """, (now, item_id))
                 conn.commit()
-                with lock:
-                    results.scan_writes += 5
+                counts.scan_writes += KOMETA_BATCH
+                counts.record("kometa", start)
             except sqlite3.OperationalError:
-                with lock:
-                    results.scan_errors += 1
+                counts.scan_errors += 1
                 try:
                     conn.rollback()
                 except:
                     pass
-
-            time.sleep(0.005)  # Kometa is aggressive
-
-        conn.close()
-
-    def playback_stream(stream_id: int):
-        """Simulate active playback - reads + watch progress writes"""
-        conn = sqlite3.connect(db_path, timeout=0.05)  # VERY short - playback can't wait!
-
-        while not stop_flag.is_set():
+    finally:
+        if conn is not None:
+            conn.close()
+        result_queue.put(counts)  # Always report, even if the worker fails
+
+
+def sqlite_playback_stream(db_path: str, worst_case: bool, rates: TargetRates, stop_flag, result_queue,
+                           ready, stream_id: int):
+    """Simulate active playback - reads + watch progress writes"""
+    counts = StressResults()
+    conn = None
+    randint = random.Random(f"stream-{stream_id}").randint
+    max_id = 1
+    next_refresh = 0.0
+    poll_count = 0
+
+    try:
+        try:
+            conn = sqlite_connect(db_path, timeout=0.05, worst_case=worst_case)  # VERY short - playback can't wait!
+        finally:
+            ready.wait()  # Start together, even if this connect failed
+        for _ in paced(stop_flag, rates.playback_hz):
             # Read: Get media info (happens constantly during playback)
             try:
-                conn.execute("""
-                    SELECT id, title, duration FROM stress_metadata
-                    ORDER BY RANDOM() LIMIT 1
-                """).fetchone()
-
-                # Also read from real Plex tables
-                conn.execute("""
-                    SELECT id, title, rating FROM metadata_items
-                    WHERE id = ?
-                """, (random.randint(1, 60000),)).fetchone()
-
-                with lock:
-                    results.playback_reads += 2
+                start = time.perf_counter_ns()
+                # Random row by primary key instead of ORDER BY RANDOM(), which
+                # scans + sorts a table the scanners keep growing. The id range
+                # is refreshed once a second (max(id) is an index lookup).
+                now = time.monotonic()
+                if now >= next_refresh:
+                    max_id = conn.execute("SELECT max(id) FROM stress_metadata").fetchone()[0] or 1
+                    next_refresh = now + 1
+                media_id = randint(1, max_id)
+                # Media row + real Plex metadata_items row in one statement
+                conn.execute(SQLITE_PLAYBACK_READ, (media_id, randint(1, 60000))).fetchall()
+
+                counts.playback_reads += 2
+                counts.record("read", start)
             except sqlite3.OperationalError:
-                with lock:
-                    results.playback_read_errors += 1
+                counts.playback_read_errors += 1
 
             # Write: Update watch progress (every few seconds during playback)
-            try:
-                conn.execute("""
-                    INSERT INTO stress_progress (metadata_id, view_offset, updated_at)
-                    VALUES (?, ?, ?)
-                """, (random.randint(1, 1000), random.randint(0, 10800000), time.time()))
-                conn.commit()
-                with lock:
-                    results.playback_writes += 1
-            except sqlite3.OperationalError:
-                with lock:
-                    results.playback_write_errors += 1
+            poll_count += 1
+            if poll_count % PROGRESS_EVERY == 0:
                 try:
-                    conn.rollback()
-                except:
-                    pass
-
-            # Playback polling interval - needs to be fast for smooth UX
-            time.sleep(0.02)
-
-        conn.close()
-
-    # Start threads: 2 scanners + Kometa + streams
-    start_time = time.perf_counter()
-
-    scanner_threads = [threading.Thread(target=library_scanner, args=(i,)) for i in range(2)]
-    kometa_thread = threading.Thread(target=kometa_updater)
-    stream_threads = [threading.Thread(target=playback_stream, args=(i,)) for i in range(num_streams)]
+                    start = time.perf_counter_ns()
+                    conn.execute("""
+                        INSERT INTO stress_progress (metadata_id, view_offset, updated_at)
+                        VALUES (?, ?, ?)
+                    """, (randint(1, 1000), randint(0, 10800000), time.time()))  # autocommit
+                    counts.playback_writes += 1
+                    counts.record("write", start)
+                except sqlite3.OperationalError:
+                    counts.playback_write_errors += 1
+    finally:
+        if conn is not None:
+            conn.close()
+        result_queue.put(counts)  # Always report, even if the worker fails
+
+
+
+def run_sqlite_stress(db_path: str, duration: int = 10, num_streams: int = 4,
+                      worst_case: bool = False, processes: bool = False,
+                      rates: TargetRates = TargetRates()) -> StressResults:
+    """
+    Simulate heavy library scan + concurrent playback on SQLite.
 
-    for t in scanner_threads:
-        t.start()
-    kometa_thread.start()
-    for t in stream_threads:
-        t.start()
+    Real-Debrid/rclone scenario:
+    - Scanner: Rapidly inserting/updating metadata (like scanning mounted cloud storage)
+    - Streams: Reading media info + updating watch progress
+    - Kometa: Concurrent metadata updates
 
-    # Run for duration
-    time.sleep(duration)
-    stop_flag.set()
+    Args:
+        worst_case: Rollback journal + default pragmas instead of tuned WAL
+        processes: Run each worker in its own process instead of a thread, so
+            the Python side of the workers isn't serialized by the GIL
+        rates: Target loop rate of each worker type
+    """
+    mode = "worst case: rollback journal" if worst_case else "WAL + synchronous=NORMAL"
+    mode += ", processes" if processes else ""
+    print(f"\n{YELLOW}[SQLite Stress Test - {mode}]{NC}")
+    print(f"  Simulating: 2 scanners + {num_streams} streams + Kometa writes")
+    print(f"  Duration: {duration}s")
+    print(f"  This simulates real rclone/Real-Debrid + Kometa workload...\n")
 
-    for t in scanner_threads:
-        t.join()
-    kometa_thread.join()
-    for t in stream_threads:
-        t.join()
+    # Ready barrier: every worker + this thread (60s covers a worker that dies before it)
+    parties = 2 + 1 + num_streams + 1
+    if processes:
+        Worker, stop_flag, result_queue = mp.Process, mp.Event(), mp.Queue()
+        ready = mp.Barrier(parties, timeout=60)
+    else:
+        Worker, stop_flag, result_queue = threading.Thread, threading.Event(), queue.Queue()
+        ready = threading.Barrier(parties, timeout=60)
+
+    # Journal mode persists in the database file: set it once, restore it afterwards
+    journal = "delete" if worst_case else "wal"
+    conn = sqlite_connect(db_path, timeout=30, worst_case=worst_case)
+    original_journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    # SQLite answers with the mode actually in effect, which can differ (e.g. DB busy)
+    current = conn.execute(f"PRAGMA journal_mode={journal.upper()}").fetchone()[0]
+    if current.lower() != journal:
+        conn.close()
+        print(f"{RED}ERROR: Could not switch journal mode to {journal.upper()} (still {current.upper()}){NC}")
+        sys.exit(1)
 
-    results.total_time_ms = (time.perf_counter() - start_time) * 1000
+    try:
+        # Create test tables
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stress_metadata (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guid TEXT,
+                title TEXT,
+                summary TEXT,
+                duration INTEGER,
+                added_at REAL,
+                updated_at REAL DEFAULT ((julianday('now') - 2440587.5) * 86400.0)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stress_progress (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                metadata_id INTEGER,
+                view_offset INTEGER,
+                updated_at REAL
+            )
+        """)
+        conn.close()
 
-    # Cleanup
-    conn = sqlite3.connect(db_path)
-    conn.execute("DROP TABLE IF EXISTS stress_metadata")
-    conn.execute("DROP TABLE IF EXISTS stress_progress")
-    conn.commit()
-    conn.close()
+        # Start workers: 2 scanners + Kometa + streams
+        args = (db_path, worst_case, rates, stop_flag, result_queue, ready)
+        workers = [Worker(target=sqlite_library_scanner, args=args + (i,)) for i in range(2)]
+        workers.append(Worker(target=sqlite_kometa_updater, args=args))
+        workers += [Worker(target=sqlite_playback_stream, args=args + (i,)) for i in range(num_streams)]
+
+        for w in workers:
+            w.start()
+
+        # The clock starts once every worker is up and connected
+        ready.wait()
+        start_time = time.perf_counter()
+
+        # Run for duration
+        time.sleep(duration)
+        stop_flag.set()
+
+        # Drain before joining: a process can't exit until its queued result is read
+        results = merge_counts([result_queue.get() for _ in workers])
+        for w in workers:
+            w.join()
+        results.targets = rates.totals(num_streams)
+
+        results.total_time_ms = (time.perf_counter() - start_time) * 1000
+    finally:
+        stop_flag.set()  # Ctrl-C or a failure: don't leave threads running
+        # Cleanup, leaving the Plex database in the journal mode we found it in
+        conn = sqlite_connect(db_path, timeout=30, worst_case=worst_case)
+        conn.execute("DROP TABLE IF EXISTS stress_metadata")
+        conn.execute("DROP TABLE IF EXISTS stress_progress")
+        conn.execute(f"PRAGMA journal_mode={original_journal}")
+        conn.close()
 
     return results
 
 
-def run_postgresql_stress(duration: int = 10, num_streams: int = 4, use_socket: bool = False) -> StressResults:
+def run_postgresql_stress(duration: int = 10, num_streams: int = 4, use_socket: bool = False,
+                          isolation: str = "read_committed", pgbouncer: bool = False,
+                          rates: TargetRates = TargetRates()) -> StressResults:
     """
     Simulate heavy library scan + concurrent playback on PostgreSQL.
     
@@ -292,150 +601,157 @@ def run_postgresql_stress(duration: int = 10, num_streams: int = 4, use_socket:
         duration: Test duration in seconds
         num_streams: Number of concurrent playback streams
         use_socket: Use Unix socket instead of TCP/IP
+        isolation: Transaction isolation level for every worker session
+        pgbouncer: Connect over TCP through PgBouncer on PG_PGBOUNCER_PORT.
+            Statements are sent unprepared; session SETs (isolation,
+            synchronous_commit) only reach whichever server connection
+            PgBouncer picks, so they are best-effort there.
+        rates: Target loop rate of each worker type
     """
-    pg_config = get_pg_config(use_socket=use_socket)
-    conn_type = "Unix socket" if use_socket else "TCP/IP"
-    conn_detail = PG_SOCKET if use_socket else f"{PG_HOST}:{PG_PORT}"
+    if pgbouncer:
+        pg_config = {**get_pg_config(use_socket=False), "port": PG_PGBOUNCER_PORT}
+        conn_type = "PgBouncer"
+        conn_detail = f"{PG_HOST}:{PG_PGBOUNCER_PORT}"
+    else:
+        pg_config = get_pg_config(use_socket=use_socket)
+        conn_type = "Unix socket" if use_socket else "TCP/IP"
+        conn_detail = PG_SOCKET if use_socket else f"{PG_HOST}:{PG_PORT}"
     
     print(f"\n{YELLOW}[PostgreSQL Stress Test - {conn_type}]{NC}")
     print(f"  Connection: {conn_type} ({conn_detail})")
     print(f"  Simulating: 2 scanners + {num_streams} streams + Kometa writes")
-    print(f"  Duration: {duration}s")
+    print(f"  Duration: {duration}s, isolation: {ISOLATION_LEVELS[isolation]}")
     print(f"  PostgreSQL uses MVCC - no blocking between readers/writers...\n")
 
-    results = StressResults()
+    worker_counts = []  # One StressResults per worker, appended at exit
     stop_flag = threading.Event()
-    lock = threading.Lock()
 
-    pg_pool = pool.ThreadedConnectionPool(1, num_streams + 10, **pg_config)  # 2 scanners + kometa + streams + margin
+    # Open a connection per worker (2 scanners + Kometa + streams) plus one for
+    # setup before the run, so no worker pays the connect + auth round-trips
+    num_workers = num_streams + 3
+    pg_pool = pool.ThreadedConnectionPool(num_workers + 1, num_streams + 10, **pg_config)
+    warm = [pg_pool.getconn() for _ in range(num_workers + 1)]
+    for conn in warm:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.commit()
+    for conn in warm:
+        pg_pool.putconn(conn)
 
     # Create test tables
     conn = pg_pool.getconn()
     cur = conn.cursor()
-    cur.execute(f"""
-        CREATE TABLE IF NOT EXISTS {PG_SCHEMA}.stress_metadata (
-            id SERIAL PRIMARY KEY,
-            guid TEXT,
-            title TEXT,
-            summary TEXT,
-            duration INTEGER,
-            added_at DOUBLE PRECISION,
-            updated_at DOUBLE PRECISION
-        )
-    """)
-    cur.execute(f"""
-        CREATE TABLE IF NOT EXISTS {PG_SCHEMA}.stress_progress (
-            id SERIAL PRIMARY KEY,
-            metadata_id INTEGER,
-            view_offset INTEGER,
-            updated_at DOUBLE PRECISION
-        )
-    """)
+    for sql in PG_STRESS_TABLES:
+        cur.execute(sql)
     conn.commit()
     pg_pool.putconn(conn)
 
     def library_scanner(scanner_id: int):
         """Simulate heavy library scan - lots of writes"""
+        counts = StressResults()
         conn = pg_pool.getconn()
-        cur = conn.cursor()
-        batch_size = 10
+        rng = random.Random(f"scanner-{scanner_id}")
+        batch_size = SCAN_BATCH  # One explicit transaction per batch
 
         try:
-            while not stop_flag.is_set():
+            # Session setup inside the try so a failure still returns the connection
+            pg_set_isolation(conn, isolation)
+            cur = conn.cursor()
+            for _ in paced(stop_flag, rates.scanner_hz):
                 try:
-                    for _ in range(batch_size):
-                        guid = f"com.plexapp.agents.imdb://{random.randint(1000000, 9999999)}"
-                        cur.execute(f"""
-                            INSERT INTO {PG_SCHEMA}.stress_metadata (guid, title, summary, duration, added_at, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s)
-                        """, (
-                            guid,
-                            f"Movie {random.randint(1, 100000)}",
-                            "A movie about things happening" * 10,
-                            random.randint(3600000, 10800000),
-                            time.time(),
-                            time.time()
-                        ))
-                    conn.commit()
-                    with lock:
-                        results.scan_writes += batch_size
+                    rows = scan_rows(batch_size, rng)
+                    start = time.perf_counter_ns()
+                    cur.copy_expert(PG_SCAN_COPY, copy_text(rows))
+                    conn.commit()  # Same commit per batch as before, only the protocol changed
+                    counts.scan_writes += batch_size
+                    counts.record("scan", start)
                 except Exception:
-                    with lock:
-                        results.scan_errors += 1
+                    counts.scan_errors += 1
                     conn.rollback()
-
-                time.sleep(0.005)  # Faster scanning
         finally:
             pg_pool.putconn(conn)
+            worker_counts.append(counts)
 
     def kometa_updater():
         """Simulate Kometa/PMM updating metadata - competing writer"""
+        counts = StressResults()
         conn = pg_pool.getconn()
-        cur = conn.cursor()
+        rng = random.Random("kometa")
 
         try:
-            while not stop_flag.is_set():
+            pg_set_isolation(conn, isolation)
+            cur, sql = pg_statements(conn, "upd_item", prepare=not pgbouncer)
+            for _ in paced(stop_flag, rates.kometa_hz):
                 try:
-                    cur.execute(f"""
-                        UPDATE {PG_SCHEMA}.metadata_items SET updated_at = %s
-                        WHERE id = %s
-                    """, (time.time(), random.randint(1, 60000)))
+                    start = time.perf_counter_ns()
+                    # One round-trip for the whole batch
+                    now = time.time()  # One clock read per batch
+                    rows = [(now, item_id) for item_id in rng.choices(ITEM_IDS, k=KOMETA_BATCH)]
+                    execute_batch(cur, sql["upd_item"], rows, page_size=KOMETA_BATCH)
                     conn.commit()
-                    with lock:
-                        results.scan_writes += 1
+                    counts.scan_writes += KOMETA_BATCH
+                    counts.record("kometa", start)
                 except Exception:
-                    with lock:
-                        results.scan_errors += 1
+                    counts.scan_errors += 1
                     conn.rollback()
-
-                time.sleep(0.02)
         finally:
             pg_pool.putconn(conn)
+            worker_counts.append(counts)
 
     def playback_stream(stream_id: int):
         """Simulate active playback - reads + watch progress writes"""
+        counts = StressResults()
         conn = pg_pool.getconn()
-        cur = conn.cursor()
+        randint = random.Random(f"stream-{stream_id}").randint
+        max_id = 1
+        next_refresh = 0.0
+        poll_count = 0
 
         try:
-            while not stop_flag.is_set():
+            pg_set_isolation(conn, isolation)
+            cur, sql = pg_statements(conn, "sel_max_id", "sel_playback", "ins_prog",
+                                     prepare=not pgbouncer)
+            # Autocommit: every read and progress write is its own single-statement
+            # transaction, so no read snapshot is held across the poll loop.
+            # Progress is replaceable, so its commits skip waiting for the WAL fsync
+            # (a crash loses the last few).
+            conn.autocommit = True
+            cur.execute("SET synchronous_commit = off")
+            for _ in paced(stop_flag, rates.playback_hz):
                 # Read: Get media info
                 try:
-                    cur.execute(f"""
-                        SELECT id, title, duration FROM {PG_SCHEMA}.stress_metadata
-                        ORDER BY RANDOM() LIMIT 1
-                    """)
-                    cur.fetchone()
-
-                    cur.execute(f"""
-                        SELECT id, title, rating FROM {PG_SCHEMA}.metadata_items
-                        WHERE id = %s
-                    """, (random.randint(1, 60000),))
-                    cur.fetchone()
-
-                    with lock:
-                        results.playback_reads += 2
+                    start = time.perf_counter_ns()
+                    # Random row by primary key (see the SQLite stream), id range
+                    # refreshed once a second
+                    now = time.monotonic()
+                    if now >= next_refresh:
+                        cur.execute(sql["sel_max_id"])
+                        max_id = cur.fetchone()[0] or 1
+                        next_refresh = now + 1
+                    media_id = randint(1, max_id)
+                    # Media + metadata_items lookups fused into one round-trip
+                    cur.execute(sql["sel_playback"], (media_id, randint(1, 60000)))
+                    cur.fetchall()
+
+                    counts.playback_reads += 2
+                    counts.record("read", start)
                 except Exception:
-                    with lock:
-                        results.playback_read_errors += 1
-
-                # Write: Update watch progress
-                try:
-                    cur.execute(f"""
-                        INSERT INTO {PG_SCHEMA}.stress_progress (metadata_id, view_offset, updated_at)
-                        VALUES (%s, %s, %s)
-                    """, (random.randint(1, 1000), random.randint(0, 10800000), time.time()))
-                    conn.commit()
-                    with lock:
-                        results.playback_writes += 1
-                except Exception:
-                    with lock:
-                        results.playback_write_errors += 1
-                    conn.rollback()
-
-                time.sleep(0.05)  # Fast polling for smooth playback
+                    counts.playback_read_errors += 1
+
+                # Write: Update watch progress (autocommitted), every PROGRESS_EVERY polls
+                poll_count += 1
+                if poll_count % PROGRESS_EVERY == 0:
+                    try:
+                        start = time.perf_counter_ns()
+                        cur.execute(sql["ins_prog"],
+                                    (randint(1, 1000), randint(0, 10800000), time.time()))
+                        counts.playback_writes += 1
+                        counts.record("write", start)
+                    except Exception:
+                        counts.playback_write_errors += 1
         finally:
             pg_pool.putconn(conn)
+            worker_counts.append(counts)
 
     # Start threads: 2 scanners + Kometa + streams
     start_time = time.perf_counter()
@@ -459,7 +775,9 @@ def run_postgresql_stress(duration: int = 10, num_streams: int = 4, use_socket:
     for t in stream_threads:
         t.join()
 
+    results = merge_counts(worker_counts)
     results.total_time_ms = (time.perf_counter() - start_time) * 1000
+    results.targets = rates.totals(num_streams)
 
     # Cleanup
     conn = pg_pool.getconn()
@@ -473,6 +791,129 @@ def run_postgresql_stress(duration: int = 10, num_streams: int = 4, use_socket:
     return results
 
 
+def run_postgresql_async_stress(duration: int = 10, num_streams: int = 4, use_socket: bool = False,
+                                isolation: str = "read_committed",
+                                rates: TargetRates = TargetRates()) -> StressResults:
+    """
+    Same workload as run_postgresql_stress, as asyncio coroutines over asyncpg.
+
+    One thread drives every client; asyncpg speaks the binary protocol and
+    caches a prepared statement per query on each connection. Scanner batches
+    use binary COPY (copy_records_to_table).
+    """
+    conn_type = "Unix socket" if use_socket else "TCP/IP"
+    print(f"\n{YELLOW}[PostgreSQL Stress Test - asyncpg, {conn_type}]{NC}")
+    print(f"  Simulating: 2 scanners + {num_streams} streams + Kometa writes (one thread, asyncio)")
+    print(f"  Duration: {duration}s, isolation: {ISOLATION_LEVELS[isolation]}\n")
+
+    async def run() -> StressResults:
+        worker_counts = []  # One StressResults per coroutine, appended at exit
+        stop_flag = asyncio.Event()
+        # min_size opens one connection per task up front: connection setup
+        # stays out of the timed run (max_size leaves room for setup/cleanup)
+        pg_pool = await asyncpg.create_pool(
+            min_size=2 + 1 + num_streams, max_size=num_streams + 10, **get_pg_config(use_socket),
+            server_settings={"default_transaction_isolation": ISOLATION_LEVELS[isolation].lower()})
+
+        async with pg_pool.acquire() as conn:
+            for sql in PG_STRESS_TABLES:
+                await conn.execute(sql)
+
+        async def library_scanner(scanner_id: int):
+            """Simulate heavy library scan - lots of writes"""
+            counts = StressResults()
+            rng = random.Random(f"scanner-{scanner_id}")
+            batch_size = SCAN_BATCH
+            async with pg_pool.acquire() as conn:
+                async for _ in apaced(stop_flag, rates.scanner_hz):
+                    try:
+                        rows = scan_rows(batch_size, rng)
+                        start = time.perf_counter_ns()
+                        await conn.copy_records_to_table("stress_metadata", schema_name=PG_SCHEMA,
+                                                         columns=SCAN_COLUMNS, records=rows)
+                        counts.scan_writes += batch_size
+                        counts.record("scan", start)
+                    except asyncpg.PostgresError:
+                        counts.scan_errors += 1
+            worker_counts.append(counts)
+
+        async def kometa_updater():
+            """Simulate Kometa/PMM updating metadata - competing writer"""
+            counts = StressResults()
+            rng = random.Random("kometa")
+            async with pg_pool.acquire() as conn:
+                async for _ in apaced(stop_flag, rates.kometa_hz):
+                    try:
+                        start = time.perf_counter_ns()
+                        now = time.time()  # One clock read per batch
+                        rows = [(now, item_id) for item_id in rng.choices(ITEM_IDS, k=KOMETA_BATCH)]
+                        async with conn.transaction():
+                            await conn.executemany(PG_PREPARED["upd_item"], rows)
+                        counts.scan_writes += KOMETA_BATCH
+                        counts.record("kometa", start)
+                    except asyncpg.PostgresError:
+                        counts.scan_errors += 1
+            worker_counts.append(counts)
+
+        async def playback_stream(stream_id: int):
+            """Simulate active playback - reads + watch progress writes"""
+            counts = StressResults()
+            randint = random.Random(f"stream-{stream_id}").randint
+            max_id = 1
+            next_refresh = 0.0
+            poll_count = 0
+            async with pg_pool.acquire() as conn:
+                # Single-statement progress writes; skip the WAL fsync wait on commit
+                await conn.execute("SET synchronous_commit = off")
+                async for _ in apaced(stop_flag, rates.playback_hz):
+                    try:
+                        start = time.perf_counter_ns()
+                        now = time.monotonic()
+                        if now >= next_refresh:
+                            max_id = await conn.fetchval(PG_PREPARED["sel_max_id"]) or 1
+                            next_refresh = now + 1
+                        media_id = randint(1, max_id)
+                        await conn.fetch(PG_PREPARED["sel_playback"], media_id, randint(1, 60000))
+                        counts.playback_reads += 2
+                        counts.record("read", start)
+                    except asyncpg.PostgresError:
+                        counts.playback_read_errors += 1
+
+                    poll_count += 1
+                    if poll_count % PROGRESS_EVERY == 0:
+                        try:
+                            start = time.perf_counter_ns()
+                            await conn.execute(PG_PREPARED["ins_prog"], randint(1, 1000),
+                                               randint(0, 10800000), time.time())
+                            counts.playback_writes += 1
+                            counts.record("write", start)
+                        except asyncpg.PostgresError:
+                            counts.playback_write_errors += 1
+            worker_counts.append(counts)
+
+        start_time = time.perf_counter()
+        tasks = [asyncio.create_task(library_scanner(i)) for i in range(2)]
+        tasks.append(asyncio.create_task(kometa_updater()))
+        tasks += [asyncio.create_task(playback_stream(i)) for i in range(num_streams)]
+
+        await asyncio.sleep(duration)
+        stop_flag.set()
+        await asyncio.gather(*tasks)
+
+        results = merge_counts(worker_counts)
+        results.total_time_ms = (time.perf_counter() - start_time) * 1000
+        results.targets = rates.totals(num_streams)
+
+        # Cleanup
+        async with pg_pool.acquire() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {PG_SCHEMA}.stress_metadata")
+            await conn.execute(f"DROP TABLE IF EXISTS {PG_SCHEMA}.stress_progress")
+        await pg_pool.close()
+        return results
+
+    return asyncio.run(run())
+
+
 def print_results(name: str, results: StressResults, color: str):
     """Print results for a stress test"""
     total_ops = results.scan_writes + results.playback_reads + results.playback_writes
@@ -485,10 +926,40 @@ def print_results(name: str, results: StressResults, color: str):
     print(f"    Watch progress writes:  {results.playback_writes:>6} (errors: {RED}{results.playback_write_errors}{NC})")
     print(f"    Total operations:       {GREEN}{total_ops:>6}{NC}")
     print(f"    Error rate:             {RED if error_rate > 1 else GREEN}{error_rate:.1f}%{NC}")
+
+    # Rate sustained vs target: how close each backend kept up with the workload
+    seconds = max(results.total_time_ms / 1000, 1e-9)
+    latencies = {op: [] for op in OP_LABELS}
+    for _, op, latency_us in results.events:
+        latencies[op].append(latency_us)
+    if results.events:
+        print("    Latency p50/p95/p99, rate vs target:")
+    for op, samples in latencies.items():
+        if samples:
+            samples.sort()
+            p50, p95, p99 = (percentile(samples, p) / 1000 for p in (50, 95, 99))
+            rate = f"{len(samples) / seconds:.0f}/s of {results.targets[op]:.0f}/s" if op in results.targets else ""
+            print(f"      {OP_LABELS[op] + ':':<18}{p50:>8.2f} / {p95:.2f} / {p99:.2f}ms  {rate}")
     print()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Plex stress test: library scan + playback")
+    parser.add_argument("--worst-case", action="store_true",
+                        help="also run SQLite with the rollback journal and default pragmas")
+    parser.add_argument("--isolation", choices=ISOLATION_LEVELS, default="read_committed",
+                        help="PostgreSQL transaction isolation level (default: read_committed)")
+    parser.add_argument("--processes", action="store_true",
+                        help="run the SQLite workers as processes instead of threads")
+    parser.add_argument("--scanner-hz", type=float, default=TargetRates.scanner_hz,
+                        help="scan batches/sec per scanner (default: %(default)s)")
+    parser.add_argument("--kometa-hz", type=float, default=TargetRates.kometa_hz,
+                        help="Kometa update batches/sec (default: %(default)s)")
+    parser.add_argument("--playback-hz", type=float, default=TargetRates.playback_hz,
+                        help="polls/sec per playback stream (default: %(default)s)")
+    args = parser.parse_args()
+    rates = TargetRates(args.scanner_hz, args.kometa_hz, args.playback_hz)
+
     print(f"\n{BLUE}{'═' * 70}{NC}")
     print(f"{BLUE}{BOLD}  Plex Stress Test: Library Scan + Playback (rclone/Real-Debrid){NC}")
     print(f"{BLUE}{'═' * 70}{NC}")
@@ -514,24 +985,49 @@ def main():
     socket_available = check_socket_available()
     
     print(f"\n{BLUE}{'─' * 70}{NC}")
-    sqlite_results = run_sqlite_stress(db_path, duration, num_streams)
-    print_results("SQLite", sqlite_results, YELLOW)
+    sqlite_results = run_sqlite_stress(db_path, duration, num_streams, processes=args.processes, rates=rates)
+    print_results("SQLite (WAL)", sqlite_results, YELLOW)
+
+    sqlite_worst_results = None
+    if args.worst_case:
+        print(f"{BLUE}{'─' * 70}{NC}")
+        sqlite_worst_results = run_sqlite_stress(db_path, duration, num_streams, worst_case=True,
+                                                 processes=args.processes, rates=rates)
+        print_results("SQLite (worst case)", sqlite_worst_results, RED)
 
     # Run PostgreSQL TCP test
     print(f"{BLUE}{'─' * 70}{NC}")
-    pg_tcp_results = run_postgresql_stress(duration, num_streams, use_socket=False)
+    pg_tcp_results = run_postgresql_stress(duration, num_streams, use_socket=False, isolation=args.isolation,
+                                           rates=rates)
     print_results("PostgreSQL (TCP)", pg_tcp_results, CYAN)
 
     # Run PostgreSQL Unix socket test if available
     pg_socket_results = None
     if socket_available:
         print(f"{BLUE}{'─' * 70}{NC}")
-        pg_socket_results = run_postgresql_stress(duration, num_streams, use_socket=True)
+        pg_socket_results = run_postgresql_stress(duration, num_streams, use_socket=True, isolation=args.isolation,
+                                                  rates=rates)
         print_results("PostgreSQL (Socket)", pg_socket_results, GREEN)
     else:
         print(f"\n  {YELLOW}Unix socket not available at {PG_SOCKET}{NC}")
         print(f"  {YELLOW}Skipping socket test. Set PLEX_PG_SOCKET to test.{NC}\n")
 
+    # Run the TCP test again through PgBouncer if configured
+    pg_bouncer_results = None
+    if PG_PGBOUNCER:
+        print(f"{BLUE}{'─' * 70}{NC}")
+        pg_bouncer_results = run_postgresql_stress(duration, num_streams, isolation=args.isolation, pgbouncer=True,
+                                                   rates=rates)
+        print_results("PostgreSQL (PgBouncer)", pg_bouncer_results, CYAN)
+
+    # Run the asyncpg variant (best available transport) if asyncpg is installed
+    pg_async_results = None
+    if asyncpg is not None:
+        print(f"{BLUE}{'─' * 70}{NC}")
+        pg_async_results = run_postgresql_async_stress(duration, num_streams, use_socket=socket_available,
+                                                       isolation=args.isolation, rates=rates)
+        print_results("PostgreSQL (asyncpg)", pg_async_results, GREEN)
+
     # Summary
     print(f"{BLUE}{'═' * 70}{NC}")
     print(f"{BOLD}Summary:{NC}\n")
@@ -546,7 +1042,14 @@ def main():
     
     sqlite_error_rate = 100 * sqlite_errors / max(sqlite_total + sqlite_errors, 1)
     sqlite_ops_sec = sqlite_total / duration
-    print(f"  {'SQLite':<20} {sqlite_total:<12} {RED}{sqlite_errors:<10}{NC} {sqlite_error_rate:.1f}%{'':8} {sqlite_ops_sec:.0f}")
+    print(f"  {'SQLite (WAL)':<20} {sqlite_total:<12} {RED}{sqlite_errors:<10}{NC} {sqlite_error_rate:.1f}%{'':8} {sqlite_ops_sec:.0f}")
+
+    if sqlite_worst_results:
+        worst_total = sqlite_worst_results.scan_writes + sqlite_worst_results.playback_reads + sqlite_worst_results.playback_writes
+        worst_errors = sqlite_worst_results.scan_errors + sqlite_worst_results.playback_read_errors + sqlite_worst_results.playback_write_errors
+        worst_error_rate = 100 * worst_errors / max(worst_total + worst_errors, 1)
+        worst_ops_sec = worst_total / duration
+        print(f"  {'SQLite (worst case)':<20} {worst_total:<12} {RED}{worst_errors:<10}{NC} {worst_error_rate:.1f}%{'':8} {worst_ops_sec:.0f}")
     
     pg_tcp_error_rate = 100 * pg_tcp_errors / max(pg_tcp_total + pg_tcp_errors, 1)
     pg_tcp_ops_sec = pg_tcp_total / duration
@@ -558,6 +1061,20 @@ def main():
         pg_socket_error_rate = 100 * pg_socket_errors / max(pg_socket_total + pg_socket_errors, 1)
         pg_socket_ops_sec = pg_socket_total / duration
         print(f"  {'PostgreSQL (Socket)':<20} {pg_socket_total:<12} {GREEN}{pg_socket_errors:<10}{NC} {pg_socket_error_rate:.1f}%{'':8} {pg_socket_ops_sec:.0f}")
+
+    if pg_bouncer_results:
+        pg_bouncer_total = pg_bouncer_results.scan_writes + pg_bouncer_results.playback_reads + pg_bouncer_results.playback_writes
+        pg_bouncer_errors = pg_bouncer_results.scan_errors + pg_bouncer_results.playback_read_errors + pg_bouncer_results.playback_write_errors
+        pg_bouncer_error_rate = 100 * pg_bouncer_errors / max(pg_bouncer_total + pg_bouncer_errors, 1)
+        pg_bouncer_ops_sec = pg_bouncer_total / duration
+        print(f"  {'PostgreSQL (PgBouncer)':<20} {pg_bouncer_total:<12} {GREEN}{pg_bouncer_errors:<10}{NC} {pg_bouncer_error_rate:.1f}%{'':8} {pg_bouncer_ops_sec:.0f}")
+
+    if pg_async_results:
+        pg_async_total = pg_async_results.scan_writes + pg_async_results.playback_reads + pg_async_results.playback_writes
+        pg_async_errors = pg_async_results.scan_errors + pg_async_results.playback_read_errors + pg_async_results.playback_write_errors
+        pg_async_error_rate = 100 * pg_async_errors / max(pg_async_total + pg_async_errors, 1)
+        pg_async_ops_sec = pg_async_total / duration
+        print(f"  {'PostgreSQL (asyncpg)':<20} {pg_async_total:<12} {GREEN}{pg_async_errors:<10}{NC} {pg_async_error_rate:.1f}%{'':8} {pg_async_ops_sec:.0f}")
     
     print()
 
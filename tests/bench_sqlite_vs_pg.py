@@ -1,25 +1,97 @@
 #!/usr/bin/env python3
-"""SQLite vs PostgreSQL latency comparison"""
-import sqlite3, time, os
+"""SQLite vs PostgreSQL latency comparison
+
+Usage: python3 tests/bench_sqlite_vs_pg.py [--naive] [--threads N]
+  --naive    also time the inserts as one execute() per row
+  --threads  concurrent PostgreSQL clients in Test 4 (default 8)
+
+With psycopg 3 installed, the PostgreSQL insert is also timed in pipeline mode.
+BENCH_SQLITE (default /tmp/bench_test.db) sets where the on-disk SQLite
+databases are created; an in-memory database is always run alongside them
+(so BENCH_SQLITE=:memory: falls back to the default path).
+"""
+import sqlite3, time, os, io, argparse, threading, math, statistics, tempfile
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extras import execute_values, NamedTupleCursor
+try:
+    import psycopg  # Optional psycopg 3: pipeline mode variant
+except ImportError:
+    psycopg = None
+
+parser = argparse.ArgumentParser(description="SQLite vs PostgreSQL latency comparison")
+parser.add_argument("--naive", action="store_true", help="also time the per-row INSERT loops")
+parser.add_argument("--threads", type=int, default=8, help="concurrent PostgreSQL clients in Test 4")
+args = parser.parse_args()
 
 ITERATIONS = 10000
+WARMUP = 100  # Untimed runs of each path first (statement caches, plans, page cache)
 SHIM_OVERHEAD_NS = 120  # Cached translation
 
-# SQLite setup
-db_path = "/tmp/bench_test.db"
-if os.path.exists(db_path): os.remove(db_path)
-sqlite_conn = sqlite3.connect(db_path)
-sqlite_conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, title TEXT, rating REAL)")
-sqlite_conn.execute("INSERT INTO test VALUES (1, 'Test Movie', 7.5)")
-sqlite_conn.commit()
+# SQLite setup: in-memory (the engine + driver floor, no file I/O), library
+# defaults (rollback journal, synchronous=FULL) and the WAL configuration a
+# Plex-like workload runs with. Ratios are against WAL.
+SQLITE_PATH = os.environ.get("BENCH_SQLITE", "/tmp/bench_test.db")
+if SQLITE_PATH == ":memory:":
+    # Already covered by the "memory" config; the others need a real file
+    SQLITE_PATH = os.path.join(tempfile.gettempdir(), "bench_test.db")
+SQLITE_CONFIGS = {
+    "memory": (":memory:", ""),
+    "default": (SQLITE_PATH, ""),
+    "WAL+NORMAL": ("{}_wal{}".format(*os.path.splitext(SQLITE_PATH)),
+                   "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;"
+                   " PRAGMA temp_store=MEMORY; PRAGMA cache_size=-65536;"),
+}
+BASELINE = "WAL+NORMAL"
+sqlite_conns = {}
+for name, (db_path, pragmas) in SQLITE_CONFIGS.items():
+    if db_path != ":memory:" and os.path.exists(db_path): os.remove(db_path)
+    sqlite_conn = sqlite3.connect(db_path)
+    sqlite_conn.executescript(pragmas)
+    sqlite_conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, title TEXT, rating INTEGER)")  # rating x10
+    sqlite_conn.execute("INSERT INTO test VALUES (1, 'Test Movie', 75)")
+    sqlite_conn.commit()
+    sqlite_conns[name] = sqlite_conn
+
+def print_sqlite(times, suffix=""):
+    """One line per SQLite configuration."""
+    for name, ns in times.items():
+        print(f"    {'SQLite ' + name + ':':<22}{ns/1000:6.2f} µs{suffix}")
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted sample list."""
+    rank = math.ceil(pct / 100 * len(sorted_samples))
+    return sorted_samples[min(max(rank, 1), len(sorted_samples)) - 1]
+
+def sample_ns(query):
+    """Sorted per-call latencies (ns) of ITERATIONS calls, after WARMUP untimed ones."""
+    for _ in range(WARMUP):
+        query()
+    samples = []
+    for _ in range(ITERATIONS):
+        t0 = time.perf_counter_ns()
+        query()
+        samples.append(time.perf_counter_ns() - t0)
+    samples.sort()
+    return samples
+
+def print_distribution(label, samples):
+    """p50/p95/p99/p99.9 + stddev line, in µs."""
+    cols = [percentile(samples, p) / 1000 for p in (50, 95, 99, 99.9)]
+    cols.append(statistics.pstdev(samples) / 1000)
+    print(f"    {label + ':':<22}" + "".join(f"{c:8.2f}" for c in cols))
 
-# PostgreSQL (Unix socket)
-pg_conn = psycopg2.connect(host="/tmp", user="plex", password="plex", dbname="plex")
+# PostgreSQL (Unix socket): no SSL negotiation, no per-commit WAL flush wait,
+# no JIT compile on the tiny queries, so the numbers are protocol + executor
+PG_CONFIG = dict(host="/tmp", user="plex", password="plex", dbname="plex",
+                 sslmode="disable", options="-c synchronous_commit=off -c jit=off")
+pg_conn = psycopg2.connect(**PG_CONFIG)
+pg_conn.set_session(autocommit=False)  # Each insert test is one transaction
 pg_cur = pg_conn.cursor()
 pg_cur.execute("DROP TABLE IF EXISTS plex.bench_test")
-pg_cur.execute("CREATE TABLE plex.bench_test (id SERIAL PRIMARY KEY, title TEXT, rating REAL)")
-pg_cur.execute("INSERT INTO plex.bench_test (id, title, rating) VALUES (1, 'Test Movie', 7.5)")
+# Ratings have one decimal (0.0-10.0): stored x10 as SMALLINT instead of REAL
+pg_cur.execute("CREATE TABLE plex.bench_test (id SERIAL PRIMARY KEY, title TEXT, rating SMALLINT)")
+pg_cur.execute("INSERT INTO plex.bench_test (id, title, rating) VALUES (1, 'Test Movie', 75)")
 pg_conn.commit()
 
 print("=" * 65)
@@ -29,70 +101,290 @@ print()
 
 # Test 1: SELECT
 print("[1] SELECT by Primary Key")
-start = time.perf_counter_ns()
-for _ in range(ITERATIONS):
-    sqlite_conn.execute("SELECT * FROM test WHERE id = 1").fetchone()
-sqlite_ns = (time.perf_counter_ns() - start) / ITERATIONS
+sqlite_times = {}
+for name, sqlite_conn in sqlite_conns.items():
+    for n in (WARMUP, ITERATIONS):  # Warm-up pass, then the timed pass
+        start = time.perf_counter_ns()
+        for _ in range(n):
+            sqlite_conn.execute("SELECT * FROM test WHERE id = 1").fetchone()
+    sqlite_times[name] = (time.perf_counter_ns() - start) / ITERATIONS
+sqlite_ns = sqlite_times[BASELINE]
 
-start = time.perf_counter_ns()
-for _ in range(ITERATIONS):
+for n in (WARMUP, ITERATIONS):
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        pg_cur.execute("SELECT * FROM plex.bench_test WHERE id = 1")
+        pg_cur.fetchone()
+pg_ns = (time.perf_counter_ns() - start) / ITERATIONS
+
+# Parsed + planned once: the loop only pays Bind/Execute and the row fetch
+pg_cur.execute("PREPARE bench_sel AS SELECT * FROM plex.bench_test WHERE id = $1")
+for n in (WARMUP, ITERATIONS):
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        pg_cur.execute("EXECUTE bench_sel(1)")
+        pg_cur.fetchone()
+pg_prep_ns = (time.perf_counter_ns() - start) / ITERATIONS
+pg_cur.execute("DEALLOCATE bench_sel")
+
+# Same query, rows built as namedtuples: the cost of a richer row shape
+pg_nt_cur = pg_conn.cursor(cursor_factory=NamedTupleCursor)
+for n in (WARMUP, ITERATIONS):
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        pg_nt_cur.execute("SELECT * FROM plex.bench_test WHERE id = 1")
+        pg_nt_cur.fetchone()
+pg_nt_ns = (time.perf_counter_ns() - start) / ITERATIONS
+pg_nt_cur.close()
+
+print_sqlite(sqlite_times)
+print(f"    PostgreSQL:           {pg_ns/1000:6.2f} µs  ({pg_ns/sqlite_ns:.1f}x slower)")
+print(f"    PG prepared:          {pg_prep_ns/1000:6.2f} µs  ({pg_prep_ns/sqlite_ns:.1f}x slower, PREPARE/EXECUTE)")
+print(f"    PG namedtuple:        {pg_nt_ns/1000:6.2f} µs  ({pg_nt_ns/sqlite_ns:.1f}x slower, NamedTupleCursor)")
+print(f"    PG + shim:            {(pg_ns+SHIM_OVERHEAD_NS)/1000:6.2f} µs  (shim adds {SHIM_OVERHEAD_NS/pg_ns*100:.1f}%)")
+
+# Per-call timings of the same query: the tail, not just the mean
+def pg_select():
     pg_cur.execute("SELECT * FROM plex.bench_test WHERE id = 1")
     pg_cur.fetchone()
-pg_ns = (time.perf_counter_ns() - start) / ITERATIONS
 
-print(f"    SQLite:         {sqlite_ns/1000:6.2f} µs")
-print(f"    PostgreSQL:     {pg_ns/1000:6.2f} µs  ({pg_ns/sqlite_ns:.1f}x slower)")
-print(f"    PG + shim:      {(pg_ns+SHIM_OVERHEAD_NS)/1000:6.2f} µs  (shim adds {SHIM_OVERHEAD_NS/pg_ns*100:.1f}%)")
+sqlite_baseline = sqlite_conns[BASELINE]
+sqlite_samples = sample_ns(lambda: sqlite_baseline.execute("SELECT * FROM test WHERE id = 1").fetchone())
+pg_samples = sample_ns(pg_select)
+print(f"    {'Distribution (µs)':<22}{'p50':>8}{'p95':>8}{'p99':>8}{'p99.9':>8}{'stdev':>8}")
+print_distribution(f"SQLite {BASELINE}", sqlite_samples)
+print_distribution("PostgreSQL", pg_samples)
+print()
+
+# Test 1b: round-trip only (no table, one-column row): how much of Test 1
+# is protocol/driver round-trip vs row lookup and construction
+print("[1b] Round-trip only (SELECT 1)")
+sqlite_times = {}
+for name, sqlite_conn in sqlite_conns.items():
+    for n in (WARMUP, ITERATIONS):
+        start = time.perf_counter_ns()
+        for _ in range(n):
+            sqlite_conn.execute("SELECT 1").fetchone()
+    sqlite_times[name] = (time.perf_counter_ns() - start) / ITERATIONS
+sqlite_rtt_ns = sqlite_times[BASELINE]
+
+for n in (WARMUP, ITERATIONS):
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        pg_cur.execute("SELECT 1")
+        pg_cur.fetchone()
+pg_rtt_ns = (time.perf_counter_ns() - start) / ITERATIONS
+
+print_sqlite(sqlite_times)
+print(f"    PostgreSQL:           {pg_rtt_ns/1000:6.2f} µs  ({pg_rtt_ns/sqlite_rtt_ns:.1f}x slower)")
+print(f"    PG round-trip share:  {pg_rtt_ns/pg_ns*100:5.0f} %  (of the Test 1 PostgreSQL time)")
 print()
 
 # Test 2: INSERT (batched in transaction)
 print("[2] INSERT (in transaction, no commit per row)")
 pg_cur.execute("TRUNCATE plex.bench_test")
 pg_conn.commit()
-sqlite_conn.execute("DELETE FROM test WHERE id > 1")
-sqlite_conn.commit()
 
-sqlite_conn.execute("BEGIN")
-start = time.perf_counter_ns()
-for i in range(2, ITERATIONS + 2):
-    sqlite_conn.execute("INSERT INTO test (id, title, rating) VALUES (?, ?, ?)", (i, f"Movie {i}", 5.0))
-sqlite_ins_ns = (time.perf_counter_ns() - start) / ITERATIONS
-sqlite_conn.commit()
+# Row tuples built once, before any timing: C-level map/zip instead of a
+# per-row f-string + tuple in the Python loop
+ids = range(2, ITERATIONS + 2)
+rows = list(zip(ids, map("Movie {}".format, ids), [50] * ITERATIONS))  # rating 5.0, x10
+
+sqlite_times, sqlite_naive_times = {}, {}
+for name, sqlite_conn in sqlite_conns.items():
+    sqlite_conn.execute("DELETE FROM test WHERE id > 1")
+    sqlite_conn.commit()
+
+    # Per-row execute() calls (statement cache lookup + bind each time), rolled back afterwards
+    if args.naive:
+        sqlite_conn.execute("BEGIN")
+        start = time.perf_counter_ns()
+        for row in rows:
+            sqlite_conn.execute("INSERT INTO test (id, title, rating) VALUES (?, ?, ?)", row)
+        sqlite_naive_times[name] = (time.perf_counter_ns() - start) / ITERATIONS
+        sqlite_conn.rollback()
+
+    # One statement prepared once, parameters bound in C
+    sqlite_conn.execute("BEGIN")
+    sqlite_conn.executemany("INSERT INTO test (id, title, rating) VALUES (?, ?, ?)", rows[:WARMUP])
+    sqlite_conn.rollback()
+    sqlite_conn.execute("BEGIN")
+    start = time.perf_counter_ns()
+    sqlite_conn.executemany("INSERT INTO test (id, title, rating) VALUES (?, ?, ?)", rows)
+    sqlite_times[name] = (time.perf_counter_ns() - start) / ITERATIONS
+    sqlite_conn.commit()
+sqlite_ins_ns = sqlite_times[BASELINE]
+
+# Per-row round-trips (Parse/Bind/Execute + wait for each), rolled back afterwards
+if args.naive:
+    start = time.perf_counter_ns()
+    for row in rows:
+        pg_cur.execute("INSERT INTO plex.bench_test (id, title, rating) VALUES (%s, %s, %s)", row)
+    pg_naive_ns = (time.perf_counter_ns() - start) / ITERATIONS
+    pg_conn.rollback()
+
+# psycopg 3 pipeline: every Bind/Execute is sent before any result is read;
+# the timed region ends when the pipeline block has flushed and synced
+if psycopg is not None:
+    with psycopg.connect(**PG_CONFIG, autocommit=False) as pg3_conn:
+        pg3_cur = pg3_conn.cursor()
+        with pg3_conn.pipeline():
+            for row in rows[:WARMUP]:
+                pg3_cur.execute("INSERT INTO plex.bench_test (id, title, rating) VALUES (%s, %s, %s)", row)
+        pg3_conn.rollback()
+        start = time.perf_counter_ns()
+        with pg3_conn.pipeline():
+            for row in rows:
+                pg3_cur.execute("INSERT INTO plex.bench_test (id, title, rating) VALUES (%s, %s, %s)", row)
+        pg_pipeline_ns = (time.perf_counter_ns() - start) / ITERATIONS
+        pg3_conn.rollback()
 
+# Multi-row INSERTs, 1000 rows per statement: per-row figure is amortized
+execute_values(pg_cur, "INSERT INTO plex.bench_test (id, title, rating) VALUES %s", rows[:WARMUP])
+pg_conn.rollback()
 start = time.perf_counter_ns()
-for i in range(2, ITERATIONS + 2):
-    pg_cur.execute("INSERT INTO plex.bench_test (id, title, rating) VALUES (%s, %s, %s)", (i, f"Movie {i}", 5.0))
+execute_values(pg_cur, "INSERT INTO plex.bench_test (id, title, rating) VALUES %s", rows, page_size=1000)
 pg_ins_ns = (time.perf_counter_ns() - start) / ITERATIONS
 pg_conn.commit()
 
-print(f"    SQLite:         {sqlite_ins_ns/1000:6.2f} µs")
-print(f"    PostgreSQL:     {pg_ins_ns/1000:6.2f} µs  ({pg_ins_ns/sqlite_ins_ns:.1f}x slower)")
-print(f"    PG + shim:      {(pg_ins_ns+SHIM_OVERHEAD_NS)/1000:6.2f} µs")
+print_sqlite(sqlite_times, "  (executemany)")
+print(f"    PostgreSQL:           {pg_ins_ns/1000:6.2f} µs  ({pg_ins_ns/sqlite_ins_ns:.1f}x slower, execute_values)")
+if args.naive:
+    print_sqlite(sqlite_naive_times, "  (one execute per row)")
+    print(f"    PG per-row:           {pg_naive_ns/1000:6.2f} µs  ({pg_naive_ns/sqlite_ins_ns:.1f}x slower, one execute per row)")
+if psycopg is not None:
+    print(f"    PG pipeline:          {pg_pipeline_ns/1000:6.2f} µs  ({pg_pipeline_ns/sqlite_ins_ns:.1f}x slower, psycopg 3)")
+print(f"    PG + shim:            {(pg_ins_ns+SHIM_OVERHEAD_NS)/1000:6.2f} µs")
+print()
+
+# Test 2b: bulk load (COPY vs one executemany in a write transaction)
+print("[2b] Bulk load (PG COPY FROM STDIN vs SQLite executemany)")
+pg_cur.execute("TRUNCATE plex.bench_test")
+pg_conn.commit()
+
+def copy_field(value):
+    """One COPY text-format field: \\N for NULL, backslash/tab/newline escaped."""
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+copy_lines = ["\t".join(map(copy_field, row)) + "\n" for row in rows]
+copy_buf = io.StringIO("".join(copy_lines))
+
+sqlite_times = {}
+for name, sqlite_conn in sqlite_conns.items():
+    sqlite_conn.execute("DELETE FROM test WHERE id > 1")
+    sqlite_conn.commit()
+    sqlite_conn.execute("BEGIN IMMEDIATE")
+    sqlite_conn.executemany("INSERT INTO test (id, title, rating) VALUES (?, ?, ?)", rows[:WARMUP])
+    sqlite_conn.rollback()
+    sqlite_conn.execute("BEGIN IMMEDIATE")
+    start = time.perf_counter_ns()
+    sqlite_conn.executemany("INSERT INTO test (id, title, rating) VALUES (?, ?, ?)", rows)
+    sqlite_times[name] = (time.perf_counter_ns() - start) / ITERATIONS
+    sqlite_conn.commit()
+sqlite_bulk_ns = sqlite_times[BASELINE]
+
+pg_cur.copy_expert("COPY plex.bench_test (id, title, rating) FROM STDIN WITH (FORMAT text)",
+                   io.StringIO("".join(copy_lines[:WARMUP])))
+pg_conn.rollback()
+start = time.perf_counter_ns()
+pg_cur.copy_expert("COPY plex.bench_test (id, title, rating) FROM STDIN WITH (FORMAT text)", copy_buf)
+pg_copy_ns = (time.perf_counter_ns() - start) / ITERATIONS
+pg_conn.commit()
+
+print_sqlite(sqlite_times, "/row")
+print(f"    PostgreSQL:           {pg_copy_ns/1000:6.2f} µs/row  ({pg_copy_ns/sqlite_bulk_ns:.1f}x slower, COPY)")
 print()
 
 # Test 3: Range query
 print("[3] Range Query (BETWEEN)")
-start = time.perf_counter_ns()
-for _ in range(ITERATIONS):
-    sqlite_conn.execute("SELECT * FROM test WHERE id BETWEEN 100 AND 200").fetchall()
-sqlite_range_ns = (time.perf_counter_ns() - start) / ITERATIONS
+sqlite_times = {}
+for name, sqlite_conn in sqlite_conns.items():
+    for n in (WARMUP, ITERATIONS):
+        start = time.perf_counter_ns()
+        for _ in range(n):
+            sqlite_conn.execute("SELECT * FROM test WHERE id BETWEEN 100 AND 200").fetchall()
+    sqlite_times[name] = (time.perf_counter_ns() - start) / ITERATIONS
+sqlite_range_ns = sqlite_times[BASELINE]
 
-start = time.perf_counter_ns()
-for _ in range(ITERATIONS):
-    pg_cur.execute("SELECT * FROM plex.bench_test WHERE id BETWEEN 100 AND 200")
-    pg_cur.fetchall()
+for n in (WARMUP, ITERATIONS):
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        pg_cur.execute("SELECT * FROM plex.bench_test WHERE id BETWEEN 100 AND 200")
+        pg_cur.fetchall()
 pg_range_ns = (time.perf_counter_ns() - start) / ITERATIONS
 
-print(f"    SQLite:         {sqlite_range_ns/1000:6.2f} µs")
-print(f"    PostgreSQL:     {pg_range_ns/1000:6.2f} µs  ({pg_range_ns/sqlite_range_ns:.1f}x slower)")
+print_sqlite(sqlite_times)
+print(f"    PostgreSQL:           {pg_range_ns/1000:6.2f} µs  ({pg_range_ns/sqlite_range_ns:.1f}x slower)")
+print()
+
+# Test 4: concurrent clients, one pooled connection each (a single connection
+# would serialize them), all released together. Id 1 went with the TRUNCATE
+# in Test 2b, so the lookup targets the first bulk-loaded row
+print(f"[4] Concurrent SELECT by Primary Key ({args.threads} threads, pooled connections)")
+pg_pool = ThreadedConnectionPool(minconn=2, maxconn=max(16, args.threads), **PG_CONFIG)
+# A client that fails before the barrier aborts it; the timeout covers one that hangs
+ready = threading.Barrier(args.threads + 1, timeout=60)
+
+def pooled_select():
+    conn = None
+    try:
+        conn = pg_pool.getconn()
+        cur = conn.cursor()
+        for _ in range(WARMUP):
+            cur.execute("SELECT * FROM plex.bench_test WHERE id = 2")
+            cur.fetchone()
+        ready.wait()
+        for _ in range(ITERATIONS):
+            cur.execute("SELECT * FROM plex.bench_test WHERE id = 2")
+            cur.fetchone()
+        conn.rollback()
+    except BaseException:
+        ready.abort()
+        raise
+    finally:
+        if conn is not None:
+            pg_pool.putconn(conn)
+
+threads = [threading.Thread(target=pooled_select) for _ in range(args.threads)]
+for t in threads:
+    t.start()
+ready.wait()
+start = time.perf_counter_ns()
+for t in threads:
+    t.join()
+pg_concurrent_qps = args.threads * ITERATIONS / ((time.perf_counter_ns() - start) / 1e9)
+pg_pool.closeall()
+
+print(f"    PostgreSQL:           {pg_concurrent_qps:8.0f} queries/s  (vs {1e9/pg_ns:.0f}/s on one connection)")
+print()
+
+# Storage: the loaded table vs the same rows with a REAL rating
+pg_cur.execute("SELECT count(*) FROM plex.bench_test")
+print(f"[5] Storage ({pg_cur.fetchone()[0]} rows, rating SMALLINT x10 vs REAL)")
+pg_cur.execute("CREATE TEMP TABLE bench_real AS"
+               " SELECT id, title, (rating / 10.0)::real AS rating FROM plex.bench_test")
+pg_cur.execute("""
+    SELECT pg_relation_size('plex.bench_test'), pg_relation_size('bench_real'),
+           (SELECT avg(pg_column_size(t.*)) FROM plex.bench_test t),
+           (SELECT avg(pg_column_size(r.*)) FROM bench_real r)
+""")
+pg_small_bytes, pg_real_bytes, pg_small_row, pg_real_row = pg_cur.fetchone()
+pg_cur.execute("DROP TABLE bench_real")
+pg_conn.commit()
+
+print(f"    PG SMALLINT:          {pg_small_bytes/1024:8.0f} KiB heap  ({pg_small_row:.1f} B/row)")
+print(f"    PG REAL:              {pg_real_bytes/1024:8.0f} KiB heap  ({pg_real_row:.1f} B/row)")
 print()
 
 print("=" * 65)
 print("CONCLUSION")
 print("=" * 65)
 print(f"""
-  PostgreSQL (Unix socket) is ~{pg_ns/sqlite_ns:.0f}x slower than SQLite per query.
+  PostgreSQL (Unix socket) is ~{pg_ns/sqlite_ns:.0f}x slower than SQLite ({BASELINE}) per query.
   Shim overhead (cached): {SHIM_OVERHEAD_NS/1000:.2f} µs = {SHIM_OVERHEAD_NS/pg_ns*100:.1f}% extra = NEGLIGIBLE
+  Tail (p99 per query): SQLite {percentile(sqlite_samples, 99)/1000:.2f} µs, PostgreSQL {percentile(pg_samples, 99)/1000:.2f} µs
 
   Trade-off:
     SQLite:     Faster single-query, but LOCKS on concurrent writes
@@ -100,11 +392,19 @@ print(f"""
 
   For Plex + rclone/Real-Debrid: PostgreSQL wins because
   smooth playback > raw speed
+
+  Note: PostgreSQL ran with synchronous_commit=off. That is fine for a
+  benchmark, but at runtime it trades durability of the last few commits
+  (lost on a server crash) for commit latency.
 """)
 
 # Cleanup
-sqlite_conn.close()
-os.remove(db_path)
+for name, (db_path, _) in SQLITE_CONFIGS.items():
+    sqlite_conns[name].close()
+    if db_path == ":memory:":
+        continue  # Not a file (one literally named ":memory:" isn't ours)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix): os.remove(db_path + suffix)
 pg_cur.execute("DROP TABLE IF EXISTS plex.bench_test")
 pg_conn.commit()
 pg_conn.close()